@@ -0,0 +1,114 @@
+"""벤치마크용 OpenAI 호환 가짜 서버 (POST /v1/chat/completions)
+
+실제 GPT 대신 프롬프트 종류(상담일지 요약/항목, 주간보고서, 일지 digest, 구간 요약)에 맞는 고정 응답을 돌려준다.
+지연 시간은 FAKE_LLM_LATENCY_MS ± FAKE_LLM_JITTER_MS, FAKE_LLM_RATE_LIMIT_RATIO 비율로 429를 반환한다.
+
+단독 실행 (python/ 디렉토리에서):
+    FAKE_LLM_LATENCY_MS=800 python -m bench.fake_openai --port 5101
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from fastapi import FastAPI, Request
+from starlette.responses import JSONResponse
+
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "500"))
+FAKE_LLM_JITTER_MS = float(os.getenv("FAKE_LLM_JITTER_MS", "100"))
+FAKE_LLM_RATE_LIMIT_RATIO = float(os.getenv("FAKE_LLM_RATE_LIMIT_RATIO", "0"))
+
+JOURNAL_META = {
+    "상담일자": "2025-05-25", "서비스": "방문요양", "담당자": "김난영", "상담유형": "정기상담",
+    "상담방법": "방문", "상담시간": "30분", "상담제목": "건강 상태 점검", "구분": "일반",
+    "대상자": "홍길동", "연락처": "010-0000-0000", "조치사항": "병원 동행 일정을 조율하였습니다.",
+    "상담자의견": "지속적인 관찰이 필요합니다.", "상담결과": "통증 완화를 위한 안내를 드렸습니다.",
+    "비고": "특이사항 없음",
+}
+
+WEEKLY_REPORT = {
+    "title": "2025년 5월 4주차 요양보호 주간보고서", "clientName": "홍길동", "birthDate": "1940-01-01",
+    "careLevel": "요양 3등급", "guardianContact": "010-0000-0000", "reportDate": "2025-05-30",
+    "socialWorkerName": "이복지", "summary": "대상자님은 전반적으로 안정적인 상태를 유지하고 계십니다.",
+    "riskNotes": "낙상 위험에 유의하셔야 합니다.", "evaluation": "서비스 만족도가 높으십니다.",
+    "suggestion": "주 1회 산책을 권장드립니다.", "physicalStatus": "무릎 통증이 다소 있으십니다.",
+    "mentalStatus": "정서적으로 안정되어 계십니다.", "mealSleepPattern": "식사와 수면은 규칙적이십니다.",
+    "journalSummary": [
+        {"date": "2025-05-26", "careWorker": "김난영", "service": "가사 지원", "notes": "무릎 통증 호소"},
+        {"date": "2025-05-28", "careWorker": "김난영", "service": "병원 동행", "notes": "정기 진료"},
+    ],
+}
+
+DIGEST = {
+    "service": "가사 지원, 상담", "physical": "무릎 통증", "mental": "안정적",
+    "mealSleep": "규칙적", "risks": "낙상 주의", "notes": "특이사항 없음",
+}
+
+SUMMARY = "대상자님은 최근 무릎 통증으로 외출을 어려워하고 계시며, 식사와 수면은 비교적 규칙적으로 유지하고 계십니다."
+
+
+def fake_content(messages: list) -> str:
+    system = messages[0].get("content", "") if messages else ""
+    if "일지 1건" in system:
+        return json.dumps(DIGEST, ensure_ascii=False)
+    if "주간보고서" in system or "journalSummary" in system:
+        return json.dumps(WEEKLY_REPORT, ensure_ascii=False)
+    if "\"조치사항\"" in system:
+        return json.dumps(JOURNAL_META, ensure_ascii=False)
+    if "구간" in system:
+        return "대상자는 무릎 통증을 호소하였고 병원 동행을 요청하였다."
+    return SUMMARY
+
+
+def create_fake_openai_app() -> FastAPI:
+    app = FastAPI()
+    app.state.requests = 0
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        delay = max(0.0, FAKE_LLM_LATENCY_MS + random.uniform(-FAKE_LLM_JITTER_MS, FAKE_LLM_JITTER_MS)) / 1000
+        await asyncio.sleep(delay)
+        if FAKE_LLM_RATE_LIMIT_RATIO and random.random() < FAKE_LLM_RATE_LIMIT_RATIO:
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after": "1"},
+                content={"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+            )
+        messages = body.get("messages", [])
+        content = fake_content(messages)
+        prompt_tokens = sum(len(m.get("content", "")) for m in messages)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4.1"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(content),
+                "total_tokens": prompt_tokens + len(content),
+            },
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": app.state.requests}
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5101)
+    args = parser.parse_args()
+    uvicorn.run(create_fake_openai_app(), host=args.host, port=args.port, log_level="warning")
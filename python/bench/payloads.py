@@ -0,0 +1,92 @@
+"""벤치마크 요청 데이터 (합성 오디오, 상담일지/주간보고서 payload)
+
+요청마다 내용이 조금씩 달라서 전사/LLM/digest 캐시에 걸리지 않고 매번 전체 파이프라인을 거친다.
+"""
+import io
+import wave
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+TRANSCRIPT_SENTENCES = [
+    "요즘 무릎이 많이 아파서 밖에 나가기가 힘들어요.",
+    "밤에 통증 때문에 잠을 자주 깨고 낮에도 피곤하세요?",
+    "네, 식사는 하루 두 끼 정도 드시고 있어요.",
+    "다음 주 화요일에 병원 동행을 해드릴게요.",
+    "따님이 주말마다 오시는데 요즘은 바빠서 자주 못 오신대요.",
+    "약은 아침 저녁으로 잘 챙겨 드시고 계세요.",
+]
+
+
+def synthetic_speech_wav(seconds: float = 30.0, seed: int = 0) -> bytes:
+    """발화처럼 들리는 합성 오디오(16kHz mono wav)
+
+    음절 단위(약 4Hz)로 세기가 바뀌는 배음 신호를 2~4초 발화 / 0.5~1초 쉼으로 반복한다.
+    VAD가 발화 구간으로 인식하므로 분할/배치/추론 경로가 실제 녹음과 같은 방식으로 실행된다.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(seconds * SAMPLE_RATE)
+    audio = np.zeros(total, dtype=np.float32)
+    pos = 0
+    while pos < total:
+        length = min(total - pos, int(rng.uniform(2.0, 4.0) * SAMPLE_RATE))
+        t = np.arange(length) / SAMPLE_RATE
+        pitch = rng.uniform(110, 220)
+        voice = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        envelope = 0.5 * (1 + np.sin(2 * np.pi * rng.uniform(3, 5) * t)) ** 2
+        audio[pos:pos + length] = 0.2 * voice * envelope
+        pos += length + int(rng.uniform(0.5, 1.0) * SAMPLE_RATE)
+    audio += rng.normal(0, 0.003, total).astype(np.float32)
+    pcm = (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def transcript_text(index: int, sentences: int = 40) -> str:
+    lines = [TRANSCRIPT_SENTENCES[(index + i) % len(TRANSCRIPT_SENTENCES)] for i in range(sentences)]
+    return f"(방문 {index}) " + " ".join(lines)
+
+
+def journal_payload(index: int) -> dict:
+    return {
+        "text": transcript_text(index),
+        "date": "2025-05-25",
+        "service": "방문요양",
+        "manager": "김난영",
+        "method": "방문",
+        "type": "정기상담",
+        "time": "30분",
+        "title": "건강 상태 점검",
+        "category": "일반",
+        "client": f"대상자{index}",
+        "contact": "010-0000-0000",
+        "bypassCache": True,
+    }
+
+
+def weekly_payload(index: int, journals: int = 5) -> dict:
+    return {
+        "journalSummary": [
+            {
+                "id": index * 100 + i,
+                "date": f"2025-05-{26 + i:02d}",
+                "careWorker": "김난영",
+                "service": transcript_text(index * 10 + i, sentences=20),
+                "notes": f"대상자{index} {i}일차 특이사항",
+            }
+            for i in range(journals)
+        ],
+        "periodStart": "2025-05-26",
+        "periodEnd": "2025-05-30",
+        "clientName": f"대상자{index}",
+        "birthDate": "1940-01-01",
+        "guardianContact": "010-0000-0000",
+        "reportDate": "2025-05-30",
+        "socialWorkerName": "이복지",
+        "bypassCache": True,
+    }
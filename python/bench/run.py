@@ -0,0 +1,380 @@
+"""Python 서비스 end-to-end 벤치마크 (/transcribe, /generate-journal-docx, /generate-weekly-report)
+
+가짜 OpenAI 서버(bench.fake_openai), 로컬 S3 대체 서버(moto, 또는 --s3-endpoint로 지정한 MinIO 등),
+합성 오디오(bench.payloads)를 사용해 외부 서비스 없이 같은 조건으로 반복 측정한다.
+동시 실행 수별로 처리량, 지연 시간 p50/p95/p99, 단계별 소요 시간(작업 API 기록), 서버 프로세스 트리의 최대 RSS를 보고한다.
+
+사용법 (python/ 디렉토리에서, moto[server] 필요):
+    python -m bench.run --targets journal,weekly --concurrency 1,4,16 --requests 32
+    python -m bench.run --targets transcribe --audio "samples/stt/*.webm" --concurrency 1,2,4
+    python -m bench.run --pdf-mode lazy --llm-latency-ms 1500 --output bench-result.json
+
+- transcribe는 STT 모델과 ffmpeg, PDF 변환(eager)은 LibreOffice가 설치되어 있어야 한다.
+- --audio를 주지 않으면 요청마다 다른 합성 오디오를 만든다. 실제 녹음 파일을 주면 순서대로 돌려 쓰므로
+  (같은 파일의 동시 요청은 전사 캐시에서 합쳐짐) 동시 실행 수보다 많은 파일을 두는 것이 좋다.
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import httpx
+import numpy as np
+from bench.payloads import journal_payload, synthetic_speech_wav, weekly_payload
+
+PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    "transcribe": {"service": "stt", "path": "/transcribe/"},
+    "journal": {"service": "report", "path": "/generate-journal-docx/"},
+    "weekly": {"service": "weekly_report", "path": "/generate-weekly-report/"},
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_http(url: str, timeout: float, expect_status: int = 200) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=2).status_code == expect_status:
+                return True
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def process_tree_rss(root_pid: int) -> int:
+    """root_pid와 모든 자손 프로세스(LibreOffice 등)의 RSS 합계(바이트)"""
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                parents[int(entry)] = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    tree = {root_pid}
+    changed = True
+    while changed:
+        changed = False
+        for pid, ppid in parents.items():
+            if ppid in tree and pid not in tree:
+                tree.add(pid)
+                changed = True
+    total = 0
+    for pid in tree:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+    return total
+
+
+class RssSampler:
+    """측정 구간 동안 서버 프로세스 트리의 RSS를 주기적으로 샘플링해서 최대값을 기록"""
+
+    def __init__(self, pid: int, interval: float = 0.2):
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        if self.pid:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, process_tree_rss(self.pid))
+            self._stop.wait(self.interval)
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+
+def summarize_latencies(latencies: list) -> dict:
+    if not latencies:
+        return {}
+    values = np.array(latencies)
+    return {
+        "mean": round(float(values.mean()), 3),
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p95": round(float(np.percentile(values, 95)), 3),
+        "p99": round(float(np.percentile(values, 99)), 3),
+        "max": round(float(values.max()), 3),
+    }
+
+
+class Benchmark:
+    def __init__(self, args, base_url: str, server_pid: int = None):
+        self.args = args
+        self.base_url = base_url.rstrip("/")
+        self.server_pid = server_pid
+        self.audio_files = sorted(glob.glob(args.audio)) if args.audio else []
+
+    def request_body(self, target: str, index: int):
+        if target == "transcribe":
+            if self.audio_files:
+                with open(self.audio_files[index % len(self.audio_files)], "rb") as f:
+                    return {"content": f.read()}
+            return {"content": synthetic_speech_wav(self.args.audio_seconds, seed=index)}
+        payload = journal_payload(index) if target == "journal" else weekly_payload(index)
+        return {"json": payload}
+
+    async def run_level(self, client, target: str, concurrency: int, count: int, offset: int, job_mode: bool = False):
+        """count개 요청을 concurrency개 동시 실행. job_mode면 /jobs로 제출 후 완료까지 폴링해서 단계별 시간 수집"""
+        path = TARGETS[target]["path"]
+        queue = asyncio.Queue()
+        for i in range(count):
+            queue.put_nowait(offset + i)
+        latencies, errors, stages = [], [], {}
+
+        async def worker():
+            while True:
+                try:
+                    index = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                body = self.request_body(target, index)
+                start = time.perf_counter()
+                try:
+                    if job_mode:
+                        job = await self.run_job(client, path, body["json"])
+                        for stage in job["stages"]:
+                            if stage.get("seconds") is not None:
+                                stages.setdefault(stage["name"], []).append(stage["seconds"])
+                    else:
+                        response = await client.post(f"{self.base_url}{path}", **body)
+                        if response.status_code != 200:
+                            raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+                    latencies.append(time.perf_counter() - start)
+                except Exception as e:
+                    errors.append(str(e))
+
+        wall_start = time.perf_counter()
+        with RssSampler(self.server_pid) as sampler:
+            await asyncio.gather(*[worker() for _ in range(concurrency)])
+        wall = time.perf_counter() - wall_start
+        return {
+            "latency": summarize_latencies(latencies),
+            "ok": len(latencies),
+            "errors": len(errors),
+            "error_samples": errors[:3],
+            "wall_seconds": round(wall, 2),
+            "throughput_rps": round(len(latencies) / wall, 3) if wall else 0,
+            "peak_rss_mb": round(sampler.peak / (1024 * 1024), 1) if self.server_pid else None,
+            "stages": {name: summarize_latencies(values) for name, values in stages.items()},
+        }
+
+    async def run_job(self, client, path: str, payload: dict) -> dict:
+        response = await client.post(f"{self.base_url}{path}jobs", json=payload)
+        response.raise_for_status()
+        job_id = response.json()["jobId"]
+        while True:
+            await asyncio.sleep(self.args.poll_interval)
+            job = (await client.get(f"{self.base_url}{path}jobs/{job_id}")).json()
+            if job["status"] == "succeeded":
+                return job
+            if job["status"] == "failed":
+                raise RuntimeError(job.get("error") or "job failed")
+
+    async def server_stats(self, client, target: str) -> dict:
+        # 엔드포인트별 내부 통계 (스케줄러/캐시/PDF 변환기 등)
+        urls = {
+            "transcribe": ["/transcribe/stats"],
+            "journal": ["/generate-journal-docx/pdf-converter/stats", "/generate-journal-docx/llm-cache/stats"],
+            "weekly": ["/generate-weekly-report/llm/stats", "/generate-weekly-report/digests/stats"],
+        }[target]
+        stats = {}
+        for url in urls:
+            try:
+                stats[url] = (await client.get(f"{self.base_url}{url}")).json()
+            except Exception as e:
+                stats[url] = {"error": str(e)}
+        return stats
+
+    async def run(self) -> list:
+        results = []
+        offset = int(time.time())  # 실행마다 다른 내용이 되도록 (digest/전사 캐시 회피)
+        timeout = httpx.Timeout(self.args.request_timeout)
+        limits = httpx.Limits(max_connections=max(self.args.concurrency) * 2)
+        async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+            for target in self.args.targets:
+                if target == "transcribe" and not self.wait_stt_ready():
+                    print(f"[{target}] STT 모델이 준비되지 않아 건너뜀")
+                    continue
+                # 첫 요청의 초기화 비용(템플릿 파싱, 오피스 기동 등)이 측정에 섞이지 않도록 워밍업
+                await self.run_level(client, target, 1, self.args.warmup, offset)
+                offset += self.args.warmup
+                for concurrency in self.args.concurrency:
+                    result = await self.run_level(client, target, concurrency, self.args.requests, offset)
+                    offset += self.args.requests
+                    if self.args.stage_breakdown and target != "transcribe":
+                        staged = await self.run_level(client, target, concurrency, self.args.requests, offset, job_mode=True)
+                        offset += self.args.requests
+                        result["stages"] = staged["stages"]
+                    result.update(target=target, concurrency=concurrency, requests=self.args.requests)
+                    result["server_stats"] = await self.server_stats(client, target)
+                    print_result(result)
+                    results.append(result)
+        return results
+
+    def wait_stt_ready(self) -> bool:
+        return wait_http(f"{self.base_url}/transcribe/health/ready", self.args.stt_ready_timeout)
+
+
+def print_result(result: dict):
+    latency = result["latency"] or {}
+    print(
+        f"[{result['target']:<10}] c={result['concurrency']:<3} ok={result['ok']:<4} err={result['errors']:<3} "
+        f"rps={result['throughput_rps']:<7} p50={latency.get('p50', '-')}s p95={latency.get('p95', '-')}s "
+        f"p99={latency.get('p99', '-')}s peak_rss={result['peak_rss_mb']}MB"
+    )
+    for name, stage in result["stages"].items():
+        print(f"    {name:<8} p50={stage['p50']}s p95={stage['p95']}s mean={stage['mean']}s")
+    for sample in result["error_samples"]:
+        print(f"    error: {sample}")
+
+
+def start_s3(args) -> tuple:
+    """S3 대체 서버 주소와 정리 함수 반환 (--s3-endpoint가 없으면 moto를 프로세스 안에서 실행)"""
+    if args.s3_endpoint:
+        return args.s3_endpoint, lambda: None
+    import logging
+    from moto.server import ThreadedMotoServer
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    port = free_port()
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    return f"http://127.0.0.1:{port}", server.stop
+
+
+def create_bucket(endpoint: str, bucket: str, region: str):
+    import boto3
+    s3 = boto3.client("s3", endpoint_url=endpoint, region_name=region,
+                      aws_access_key_id="bench", aws_secret_access_key="bench")
+    try:
+        s3.create_bucket(Bucket=bucket, CreateBucketConfiguration={"LocationConstraint": region})
+    except s3.exceptions.BucketAlreadyOwnedByYou:
+        pass
+
+
+def start_process(cmd: list, env: dict, log_path: str):
+    log = open(log_path, "w")
+    return subprocess.Popen(cmd, cwd=PYTHON_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", default="journal,weekly", help="transcribe,journal,weekly 중 쉼표로 구분")
+    parser.add_argument("--concurrency", default="1,4,16", help="동시 실행 수 목록 (쉼표로 구분)")
+    parser.add_argument("--requests", type=int, default=20, help="동시 실행 수별 요청 수")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--base-url", help="이미 실행 중인 서비스 주소 (주면 서버/가짜 OpenAI/S3를 띄우지 않음, RSS 측정 생략)")
+    parser.add_argument("--s3-endpoint", help="사용할 S3 대체 서버 주소 (없으면 moto 실행)")
+    parser.add_argument("--llm-latency-ms", type=float, default=500)
+    parser.add_argument("--llm-jitter-ms", type=float, default=100)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="가짜 OpenAI가 429를 반환하는 비율")
+    parser.add_argument("--pdf-mode", default="eager", choices=["eager", "lazy"])
+    parser.add_argument("--audio", help="실제 오디오 파일 glob (없으면 합성 오디오)")
+    parser.add_argument("--audio-seconds", type=float, default=30)
+    parser.add_argument("--stage-breakdown", action=argparse.BooleanOptionalAction, default=True,
+                        help="작업 API(/jobs)로 한 번 더 실행해서 단계별 소요 시간 수집 (journal/weekly)")
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    parser.add_argument("--request-timeout", type=float, default=600)
+    parser.add_argument("--stt-ready-timeout", type=float, default=600)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--log-dir", default=tempfile.gettempdir(), help="벤치마크 서버/가짜 OpenAI 로그 저장 위치")
+    args = parser.parse_args()
+    args.targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+    args.concurrency = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    unknown = [t for t in args.targets if t not in TARGETS]
+    if unknown:
+        parser.error(f"알 수 없는 대상: {unknown}")
+
+    processes = []
+    stop_s3 = lambda: None
+    server_pid = None
+    try:
+        if args.base_url:
+            base_url = args.base_url
+        else:
+            s3_endpoint, stop_s3 = start_s3(args)
+            bucket, region = os.getenv("S3_BUCKET", "oncare-backend"), os.getenv("S3_REGION", "ap-northeast-2")
+            create_bucket(s3_endpoint, bucket, region)
+
+            fake_port, server_port = free_port(), free_port()
+            env = {
+                **os.environ,
+                "FAKE_LLM_LATENCY_MS": str(args.llm_latency_ms),
+                "FAKE_LLM_JITTER_MS": str(args.llm_jitter_ms),
+                "FAKE_LLM_RATE_LIMIT_RATIO": str(args.rate_limit_ratio),
+            }
+            processes.append(start_process(
+                [sys.executable, "-m", "bench.fake_openai", "--port", str(fake_port)], env, os.path.join(args.log_dir, "bench-fake-openai.log")))
+            server_env = {
+                **env,
+                "SERVICES": ",".join(TARGETS[t]["service"] for t in args.targets),
+                "OPENAI_API_KEY": "bench",
+                "OPENAI_BASE_URL": f"http://127.0.0.1:{fake_port}/v1",
+                "S3_ENDPOINT_URL": s3_endpoint,
+                "S3_BUCKET": bucket,
+                "S3_REGION": region,
+                "AWS_ACCESS_KEY_ID": "bench",
+                "AWS_SECRET_ACCESS_KEY": "bench",
+                "LLM_CACHE_BACKEND": "none",
+                "DOCUMENT_PDF_MODE": args.pdf_mode,
+            }
+            server = start_process(
+                [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(server_port),
+                 "--log-level", "warning"],
+                server_env, os.path.join(args.log_dir, "bench-server.log"))
+            processes.append(server)
+            server_pid = server.pid
+            base_url = f"http://127.0.0.1:{server_port}"
+            if not wait_http(f"http://127.0.0.1:{fake_port}/stats", 30) or not wait_http(f"{base_url}/", 60):
+                raise RuntimeError(f"벤치마크 서버 기동 실패 ({args.log_dir}의 bench-server.log, bench-fake-openai.log 확인)")
+
+        results = asyncio.run(Benchmark(args, base_url, server_pid).run())
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump({
+                    "config": {k: v for k, v in vars(args).items()},
+                    "results": results,
+                }, f, ensure_ascii=False, indent=2)
+            print(f"결과 저장: {args.output}")
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        stop_s3()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import threading
+import traceback
+from contextlib import asynccontextmanager
+import httpx
+from common.llm_cache import call_backend
+
+# 작업 상태 저장소: memory(기본, 프로세스 내) | sqlite (gunicorn 워커 여러 개가 같은 상태를 조회할 때, gunicorn.conf.py에서 기본값으로 지정)
+JOB_STORE = os.getenv("JOB_STORE", "memory").lower()
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "jobs.sqlite3")
+JOB_TTL = float(os.getenv("JOB_TTL", str(24 * 60 * 60)))            # 완료된 작업 보관 시간(초)
+JOB_CALLBACK_TIMEOUT = float(os.getenv("JOB_CALLBACK_TIMEOUT", "10"))
+# 단계별 동시 실행 수 (예: "llm=8,render=4,pdf=2,upload=8")
+JOB_STAGE_LIMITS = os.getenv("JOB_STAGE_LIMITS", "llm=8,render=4,pdf=2,upload=8")
+
+
+def parse_limits(value: str) -> dict:
+    limits = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, limit = item.split("=", 1)
+            limits[name.strip()] = max(1, int(limit))
+    return limits
+
+
+class MemoryJobStore:
+    blocking = False
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def save(self, job: dict):
+        with self._lock:
+            self._jobs[job["id"]] = job
+            expired = [k for k, v in self._jobs.items()
+                       if v["finished_at"] and v["finished_at"] + JOB_TTL < time.time()]
+            for key in expired:
+                del self._jobs[key]
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+
+def _process_alive(pid) -> bool:
+    if not pid or pid == os.getpid():
+        # 현재 프로세스는 방금 연결을 열었으므로 이전에 기록된 진행 중 작업을 실행하고 있지 않음
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SqliteJobStore:
+    """워커 프로세스 간에 공유되는 작업 저장소
+
+    gunicorn preload_app으로 master에서 생성되어도 연결은 워커(프로세스)마다 처음 사용할 때 연다.
+    연결을 열 때 실행 중인 워커가 없는 미완료 작업(재시작 등으로 중단됨)은 failed로 기록한다.
+    디스크 I/O가 있으므로 blocking=True (JobManager가 스레드풀에서 호출).
+    """
+
+    blocking = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            self._pid = os.getpid()
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, data TEXT NOT NULL, finished_at REAL)"
+            )
+            self._fail_interrupted()
+            self._conn.commit()
+        return self._conn
+
+    def _fail_interrupted(self):
+        rows = self._conn.execute("SELECT data FROM jobs WHERE finished_at IS NULL").fetchall()
+        for (data,) in rows:
+            job = json.loads(data)
+            if _process_alive(job.get("worker")):
+                continue
+            job.update(status="failed", stage=None, error="서버 재시작으로 작업이 중단되었습니다.", finished_at=time.time())
+            self._conn.execute("UPDATE jobs SET data = ?, finished_at = ? WHERE id = ?",
+                               (json.dumps(job, ensure_ascii=False), job["finished_at"], job["id"]))
+            print(f"[작업 {job['kind']}] {job['id']} 중단됨 → failed")
+
+    def save(self, job: dict):
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, data, finished_at) VALUES (?, ?, ?)",
+                (job["id"], json.dumps(job, ensure_ascii=False), job["finished_at"]),
+            )
+            conn.execute("DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+                         (time.time() - JOB_TTL,))
+            conn.commit()
+
+    def get(self, job_id: str):
+        with self._lock:
+            row = self._connection().execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+class Job:
+    """문서 생성 작업 1건 (queued → running → succeeded | failed), 단계별 진행 상황을 기록"""
+
+    def __init__(self, kind: str, callback_url: str = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.callback_url = callback_url
+        self.status = "queued"
+        self.stage = None
+        self.stages = []
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.worker = os.getpid()   # 작업을 실행하는 워커 (재시작 후 중단된 작업 판별용)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "stages": self.stages,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "worker": self.worker,
+        }
+
+
+class JobManager:
+    """요청은 작업 ID만 즉시 반환하고, 파이프라인은 백그라운드 태스크로 실행
+
+    각 단계(llm/render/pdf/upload)는 단계별 세마포어로 동시 실행 수가 제한되며,
+    상태는 저장소에 기록되어 폴링(GET /jobs/{id}) 또는 callbackUrl로 전달된다.
+    SQLite 저장소 호출은 스레드풀에서 실행되어 이벤트 루프를 막지 않는다.
+    """
+
+    def __init__(self, store, stage_limits: dict):
+        self.store = store
+        self.stage_limits = stage_limits
+        self._semaphores = {}
+        self._tasks = set()
+
+    def _semaphore(self, name: str) -> asyncio.Semaphore:
+        # 세마포어는 이벤트 루프 안에서 처음 사용할 때 생성
+        if name not in self._semaphores:
+            self._semaphores[name] = asyncio.Semaphore(self.stage_limits.get(name, 4))
+        return self._semaphores[name]
+
+    @asynccontextmanager
+    async def stage(self, job, name: str):
+        """단계 실행 구간. job이 None이면(동기 엔드포인트) 동시 실행 수 제한만 적용"""
+        async with self._semaphore(name):
+            if job is None:
+                yield
+                return
+            record = {"name": name, "started_at": time.time(), "finished_at": None}
+            job.stage = name
+            job.stages.append(record)
+            await self._save(job)
+            yield
+            record["finished_at"] = time.time()
+            record["seconds"] = round(record["finished_at"] - record["started_at"], 2)
+            await self._save(job)
+        # 콜백은 단계 슬롯을 반납한 뒤 전송 (느린 callbackUrl이 같은 세마포어를 쓰는 다른 요청을 막지 않도록)
+        await self._notify(job)
+
+    async def _save(self, job: Job):
+        await call_backend(self.store, self.store.save, job.to_dict())
+
+    async def submit(self, kind: str, pipeline, callback_url: str = None) -> Job:
+        """pipeline(job)은 결과 dict를 반환하는 코루틴 함수"""
+        job = Job(kind, callback_url)
+        await self._save(job)
+        task = asyncio.create_task(self._run(job, pipeline))
+        # 태스크가 GC되지 않도록 참조 유지
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: Job, pipeline):
+        job.status = "running"
+        await self._save(job)
+        try:
+            job.result = await pipeline(job)
+            job.status = "succeeded"
+        except Exception as e:
+            traceback.print_exc()
+            job.status = "failed"
+            job.error = getattr(e, "detail", None) or str(e)
+        job.stage = None
+        job.finished_at = time.time()
+        await self._save(job)
+        print(f"[작업 {job.kind}] {job.id} {job.status} ({job.finished_at - job.created_at:.2f}초)")
+        await self._notify(job)
+
+    async def _notify(self, job: Job):
+        if not job.callback_url:
+            return
+        try:
+            async with httpx.AsyncClient(timeout=JOB_CALLBACK_TIMEOUT) as client:
+                await client.post(job.callback_url, json=job.to_dict())
+        except Exception as e:
+            # 콜백 실패는 작업 결과에 영향을 주지 않음 (폴링으로 조회 가능)
+            print(f"[작업 콜백 실패] {job.id} {job.callback_url}: {e}")
+
+    async def get(self, job_id: str):
+        return await call_backend(self.store, self.store.get, job_id)
+
+
+def create_job_store(name: str = JOB_STORE):
+    if name == "sqlite":
+        return SqliteJobStore(JOB_STORE_PATH)
+    return MemoryJobStore()
+
+
+job_manager = JobManager(create_job_store(), parse_limits(JOB_STAGE_LIMITS))
@@ -0,0 +1,167 @@
+import os
+import io
+import hashlib
+import zipfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from common.pdf import PDF_CONVERT_TIMEOUT, convert_docx_bytes_to_pdf
+from common.s3 import download_bytes, head_object, upload_bytes
+
+# PDF 생성 시점: eager(기본, 문서 생성 시 바로 변환/업로드) | lazy(첫 PDF 요청 시 변환)
+DOCUMENT_PDF_MODE = os.getenv("DOCUMENT_PDF_MODE", "eager").lower()
+# docx 객체 메타데이터에 기록하는 내용 해시 키 (lazy 모드에서 PDF 경로를 찾는 데 사용)
+CONTENT_HASH_METADATA = "content-sha256"
+# 프로세스별로 기억하는 docx 해시/확인된 PDF 키 최대 개수 (초과 시 오래된 것부터 제거)
+LAZY_PDF_CACHE_ENTRIES = int(os.getenv("LAZY_PDF_CACHE_ENTRIES", "10000"))
+
+
+def docx_content_hash(docx_bytes: bytes) -> str:
+    """docx 내부 파일(이름+내용) 기준 해시. zip 항목의 저장 시각이 달라도 내용이 같으면 같은 해시"""
+    digest = hashlib.sha256()
+    with zipfile.ZipFile(io.BytesIO(docx_bytes)) as archive:
+        for name in sorted(archive.namelist()):
+            digest.update(name.encode("utf-8"))
+            digest.update(b"\0")
+            digest.update(archive.read(name))
+    return digest.hexdigest()
+
+
+def content_pdf_key(prefix: str, content_hash: str) -> str:
+    return f"{prefix}/pdf/sha256/{content_hash}.pdf"
+
+
+class LazyPdfStore:
+    """내용 해시로 주소가 정해지는 PDF 저장소
+
+    같은 내용의 문서는 한 번만 변환되고, 같은 PDF에 대한 동시 요청은 진행 중인 변환 1건을 함께 기다린다.
+    """
+
+    def __init__(self, max_entries: int = LAZY_PDF_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._inflight = {}            # pdf key → Future
+        self._known = OrderedDict()    # S3에 있는 것으로 확인된 pdf key (LRU)
+        self._hashes = OrderedDict()   # docx key → 내용 해시 (docx는 업로드 후 바뀌지 않음, LRU)
+        self._lock = threading.Lock()
+        self.conversions = 0
+        self.shared_waits = 0
+        self.hits = 0
+
+    def _remember(self, entries: OrderedDict, key: str, value=None):
+        with self._lock:
+            entries[key] = value
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def _is_known(self, pdf_key: str) -> bool:
+        with self._lock:
+            if pdf_key not in self._known:
+                return False
+            self._known.move_to_end(pdf_key)
+            return True
+
+    def _content_hash(self, docx_key: str):
+        with self._lock:
+            if docx_key in self._hashes:
+                self._hashes.move_to_end(docx_key)
+                return self._hashes[docx_key]
+        head = head_object(docx_key)
+        if head is None:
+            # docx가 없으면 기존 경로의 PDF를 그대로 사용 (나중에 업로드될 수 있으므로 캐시하지 않음)
+            return None
+        content_hash = head.get("Metadata", {}).get(CONTENT_HASH_METADATA)
+        self._remember(self._hashes, docx_key, content_hash)
+        return content_hash
+
+    def pdf_key(self, prefix: str, docx_name: str) -> str:
+        """변환 없이 docx에 대응하는 PDF 키를 반환 (해시 메타데이터가 있으면 내용 주소, 없으면 기존 경로)"""
+        content_hash = self._content_hash(f"{prefix}/docx/{docx_name}")
+        if not content_hash:
+            return f"{prefix}/pdf/{os.path.splitext(docx_name)[0]}.pdf"
+        return content_pdf_key(prefix, content_hash)
+
+    def mark_uploaded(self, pdf_key: str):
+        """다른 경로(변환 API 등)로 업로드된 PDF를 확인된 키로 기록"""
+        self._remember(self._known, pdf_key)
+
+    def resolve(self, prefix: str, docx_name: str, create: bool = True):
+        """docx 파일명에 해당하는 PDF의 S3 키를 반환 (필요하면 변환 후 업로드)
+
+        해시 메타데이터가 없는 문서(eager 모드로 생성된 문서 등)는 기존 경로({prefix}/pdf/{파일명})를 그대로 반환.
+        create=False면 아직 변환되지 않은 경우 None을 반환한다.
+        """
+        docx_key = f"{prefix}/docx/{docx_name}"
+        content_hash = self._content_hash(docx_key)
+        if not content_hash:
+            return f"{prefix}/pdf/{os.path.splitext(docx_name)[0]}.pdf"
+        pdf_key = content_pdf_key(prefix, content_hash)
+        if self._is_known(pdf_key):
+            self.hits += 1
+            return pdf_key
+        if not create:
+            if head_object(pdf_key) is None:
+                return None
+            self.mark_uploaded(pdf_key)
+            return pdf_key
+
+        with self._lock:
+            future = self._inflight.get(pdf_key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[pdf_key] = future
+            else:
+                self.shared_waits += 1
+        if not owner:
+            return future.result(timeout=PDF_CONVERT_TIMEOUT * 2)
+
+        try:
+            if head_object(pdf_key) is None:
+                docx_bytes = download_bytes(docx_key)
+                pdf_bytes = convert_docx_bytes_to_pdf(docx_bytes, content_hash)
+                upload_bytes(pdf_key, pdf_bytes)
+                self.conversions += 1
+            else:
+                self.hits += 1
+            self.mark_uploaded(pdf_key)
+            future.set_result(pdf_key)
+            return pdf_key
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(pdf_key, None)
+
+    def stats(self) -> dict:
+        return {
+            "mode": DOCUMENT_PDF_MODE,
+            "conversions": self.conversions,
+            "hits": self.hits,
+            "shared_waits": self.shared_waits,
+            "inflight": len(self._inflight),
+            "known_pdfs": len(self._known),
+            "docx_hashes": len(self._hashes),
+        }
+
+
+lazy_pdfs = LazyPdfStore()
+
+
+def pdf_key_for_listing(prefix: str, pdf_name: str):
+    """목록 화면용 일괄 서명에서 사용. 목록 조회가 변환을 일으키지 않도록 이미 있는 PDF만 반환 (없으면 None)"""
+    return lazy_pdfs.resolve(prefix, f"{os.path.splitext(pdf_name)[0]}.docx", create=False)
+
+
+def listing_pdf_key():
+    """sign_file_names의 pdf_key 인자. eager 모드에서는 PDF가 기존 경로에 있으므로 S3 조회 없이 로컬 서명만 한다"""
+    return pdf_key_for_listing if DOCUMENT_PDF_MODE == "lazy" else None
+
+
+def download_pdf_key(prefix: str, pdf_name: str) -> str:
+    """단건 PDF 다운로드용 키. lazy 모드에서만 내용 주소를 찾고(필요하면 변환), eager 모드는 기존 경로를 그대로 사용"""
+    base_name = os.path.splitext(pdf_name)[0]
+    if DOCUMENT_PDF_MODE != "lazy":
+        return f"{prefix}/pdf/{base_name}.pdf"
+    return lazy_pdfs.resolve(prefix, f"{base_name}.docx")
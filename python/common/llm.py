@@ -0,0 +1,240 @@
+import os
+import time
+import random
+import asyncio
+import httpx
+import openai
+from openai import AsyncOpenAI
+from common.llm_cache import cache_key, llm_cache
+from common.metrics import llm_requests_total, llm_tokens_total, timed
+
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4.1")
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "90"))                  # 호출 1건당 제한 시간(초)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))    # 프로세스 전체 공유 커넥션 풀 크기
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))    # 동시 호출 수 상한 (429 발생 시 자동으로 줄어듦)
+LLM_RATE_LIMIT_RETRIES = int(os.getenv("LLM_RATE_LIMIT_RETRIES", "6"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))       # 재시도 대기 시간 기준(초), 시도마다 2배
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30"))
+
+_async_client = None
+
+
+def get_async_client() -> AsyncOpenAI:
+    """프로세스 전체에서 공유하는 비동기 OpenAI 클라이언트 (커넥션 풀 재사용)
+
+    .env 로딩 이후 첫 호출 시점에 생성되므로 OPENAI_API_KEY를 그때 읽는다.
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            timeout=LLM_TIMEOUT,
+            max_retries=LLM_MAX_RETRIES,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_MAX_CONNECTIONS,
+                ),
+                timeout=LLM_TIMEOUT,
+            ),
+        )
+    return _async_client
+
+
+class AdaptiveLimiter:
+    """LLM 동시 호출 수 제한 (AIMD)
+
+    429를 받으면 허용 동시 호출 수를 절반으로 줄이고 Retry-After(없으면 지수 백오프)만큼 새 호출을 멈춘다.
+    성공이 현재 한도만큼 이어지면 한도를 1씩 늘려 max_limit까지 회복한다.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = self.max_limit
+        self.active = 0
+        self.pause_until = 0.0
+        self.rate_limited = 0
+        self._successes = 0
+        self._condition = None
+
+    def _cond(self) -> asyncio.Condition:
+        # 이벤트 루프 안에서 처음 사용할 때 생성
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self):
+        cond = self._cond()
+        async with cond:
+            while True:
+                wait = self.pause_until - time.monotonic()
+                if wait > 0:
+                    try:
+                        await asyncio.wait_for(cond.wait(), wait)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if self.active < self.limit:
+                    self.active += 1
+                    return
+                await cond.wait()
+
+    async def release(self, rate_limited: bool = False, delay: float = 0.0):
+        cond = self._cond()
+        async with cond:
+            self.active -= 1
+            if rate_limited:
+                self.rate_limited += 1
+                self.limit = max(self.min_limit, self.limit // 2)
+                self._successes = 0
+                self.pause_until = max(self.pause_until, time.monotonic() + delay)
+            else:
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.max_limit:
+                    self.limit += 1
+                    self._successes = 0
+            cond.notify_all()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "max_limit": self.max_limit,
+            "active": self.active,
+            "rate_limited": self.rate_limited,
+            "paused_seconds": round(max(0.0, self.pause_until - time.monotonic()), 2),
+        }
+
+
+llm_limiter = AdaptiveLimiter(LLM_MAX_CONCURRENCY)
+
+
+def retry_delay(error: Exception, attempt: int) -> float:
+    """Retry-After 헤더가 있으면 그 값을, 없으면 지터를 더한 지수 백오프 시간을 반환"""
+    response = getattr(error, "response", None)
+    headers = response.headers if response is not None else {}
+    try:
+        if headers.get("retry-after-ms"):
+            return min(LLM_BACKOFF_MAX, float(headers["retry-after-ms"]) / 1000)
+        if headers.get("retry-after"):
+            return min(LLM_BACKOFF_MAX, float(headers["retry-after"]))
+    except ValueError:
+        pass
+    return min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt)) * (0.5 + random.random() / 2)
+
+
+async def create_completion(model: str, messages: list, timeout: float, label: str = "chat"):
+    """llm_limiter를 거쳐 호출. 429는 한도를 줄이며 재시도, 연결 오류/5xx는 LLM_MAX_RETRIES까지 재시도"""
+    with timed("llm", prompt=label):
+        response = await _create_completion(model, messages, timeout, label)
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        llm_tokens_total.inc(usage.prompt_tokens or 0, model=model, prompt=label, kind="prompt")
+        llm_tokens_total.inc(usage.completion_tokens or 0, model=model, prompt=label, kind="completion")
+    return response
+
+
+async def _create_completion(model: str, messages: list, timeout: float, label: str):
+    # SDK 자체 재시도는 끄고 여기서 처리 (SDK가 429를 조용히 재시도하면 한도를 조절할 수 없음)
+    client = get_async_client().with_options(max_retries=0)
+    attempt = 0
+    rate_limit_attempt = 0
+    while True:
+        await llm_limiter.acquire()
+        try:
+            response = await client.chat.completions.create(model=model, messages=messages, timeout=timeout)
+        except openai.RateLimitError as e:
+            llm_requests_total.inc(model=model, prompt=label, status="rate_limited")
+            delay = retry_delay(e, rate_limit_attempt)
+            await llm_limiter.release(rate_limited=True, delay=delay)
+            rate_limit_attempt += 1
+            if rate_limit_attempt > LLM_RATE_LIMIT_RETRIES:
+                raise
+            print(f"[LLM 429] {delay:.1f}초 후 재시도 (동시 호출 한도 {llm_limiter.limit})")
+            continue
+        except (openai.APIConnectionError, openai.InternalServerError) as e:
+            llm_requests_total.inc(model=model, prompt=label, status="error")
+            await llm_limiter.release()
+            attempt += 1
+            if attempt > LLM_MAX_RETRIES:
+                raise
+            await asyncio.sleep(retry_delay(e, attempt - 1))
+            continue
+        except BaseException:
+            llm_requests_total.inc(model=model, prompt=label, status="error")
+            await llm_limiter.release()
+            raise
+        await llm_limiter.release()
+        llm_requests_total.inc(model=model, prompt=label, status="ok")
+        return response
+
+
+async def chat(messages: list, model: str = LLM_MODEL, timeout: float = LLM_TIMEOUT,
+               cache_version: str = None, bypass_cache: bool = False, validate=None, label: str = None) -> str:
+    """chat completion 호출 후 응답 텍스트 반환
+
+    cache_version(프롬프트 템플릿 버전)을 주면 응답을 캐시한다. bypass_cache=True면 캐시를 읽지 않고 새로 호출해 갱신한다.
+    validate가 있으면 예외 없이 통과한 응답만 캐시한다. (예: json.loads)
+    label은 메트릭의 prompt 라벨 (없으면 cache_version의 이름 부분, 예: journal-summary)
+    """
+    label = label or (cache_version.split(":")[0] if cache_version else "chat")
+    key = cache_key(model, cache_version, messages) if cache_version else None
+    if key is not None:
+        if bypass_cache:
+            llm_cache.bypassed += 1
+        else:
+            cached = await llm_cache.get(key)
+            if cached is not None:
+                llm_requests_total.inc(model=model, prompt=label, status="cache_hit")
+                return cached
+    response = await create_completion(model, messages, timeout, label)
+    content = response.choices[0].message.content
+    if key is not None:
+        if validate is not None:
+            validate(content)
+        await llm_cache.set(key, content)
+    return content
+
+
+try:
+    # 정확한 토큰 수 계산 (선택 의존성). 없으면 문자 수 기반 추정 사용
+    import tiktoken
+    _encoding = tiktoken.get_encoding("o200k_base")
+except Exception:
+    _encoding = None
+
+
+def estimate_tokens(text: str) -> int:
+    """텍스트의 토큰 수 추정 (tiktoken이 없으면 한글 1글자≈1토큰, 그 외 4글자≈1토큰)"""
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    hangul = sum(1 for ch in text if "가" <= ch <= "힣")
+    others = len(text) - hangul
+    return hangul + (others + 3) // 4
+
+
+def split_by_tokens(text: str, max_tokens: int) -> list:
+    """문장/줄 경계를 유지하면서 max_tokens 이하의 구간들로 분할"""
+    import re
+    sentences = [s for s in re.split(r"(?<=[.?!。\n])\s+", text) if s.strip()]
+    segments = []
+    current = []
+    current_tokens = 0
+    for sentence in sentences:
+        tokens = estimate_tokens(sentence)
+        # 이어붙일 때 들어가는 공백도 1토큰으로 계산 (구간 전체 추정치가 max_tokens를 넘지 않도록)
+        if current and current_tokens + 1 + tokens > max_tokens:
+            segments.append(" ".join(current))
+            current, current_tokens = [], 0
+        # 한 문장이 너무 길면 글자 단위로 자름
+        while tokens > max_tokens:
+            cut = max(1, int(len(sentence) * max_tokens / tokens))
+            segments.append(sentence[:cut])
+            sentence = sentence[cut:]
+            tokens = estimate_tokens(sentence)
+        current_tokens += tokens + (1 if current else 0)
+        current.append(sentence)
+    if current:
+        segments.append(" ".join(current))
+    return segments
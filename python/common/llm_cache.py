@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from starlette.concurrency import run_in_threadpool
+
+# LLM 응답 캐시 설정
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory").lower()   # memory | sqlite | none
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(24 * 60 * 60)))  # 초
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키 계산용 정규화: 유니코드 NFC, 연속 공백 → 한 칸, 앞뒤 공백 제거"""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def cache_key(model: str, version: str, messages: list) -> str:
+    normalized = [{"role": m["role"], "content": normalize_text(m["content"])} for m in messages]
+    payload = json.dumps({"model": model, "version": version, "messages": normalized}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryBackend:
+    """프로세스 메모리 LRU (항목 수 기준 제거)"""
+
+    blocking = False
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, expires_at: float):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class SqliteBackend:
+    """로컬 SQLite 파일 (프로세스/워커 간 공유, 재시작 후에도 유지)
+
+    디스크 I/O가 있으므로 blocking=True (비동기 코드에서는 스레드풀에서 호출).
+    조회는 읽기만 하고, 사용 시각(accessed_at)은 메모리에 모아 두었다가 다음 저장 때 한 번에 기록한다.
+    연결은 프로세스마다 처음 사용할 때 연다. (gunicorn preload로 master에서 생성되어도 fork 이후 공유하지 않음)
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._touched = {}   # key → 마지막 조회 시각 (다음 set에서 반영)
+
+    def _connection(self):
+        if self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._pid = os.getpid()
+            self._touched = {}
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._connection().execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            # 만료 항목은 여기서 지우지 않고 다음 set에서 일괄 삭제
+            if row is None or row[1] < now:
+                return None
+            self._touched[key] = now
+            return row[0]
+
+    def set(self, key: str, value: str, expires_at: float):
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            if self._touched:
+                conn.executemany("UPDATE llm_cache SET accessed_at = ? WHERE key = ?",
+                                 [(at, k) for k, at in self._touched.items()])
+                self._touched = {}
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            # 만료 항목 정리 후, 최대 개수를 넘으면 오래 사용되지 않은 항목부터 삭제
+            conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (now,))
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            conn.commit()
+
+    def size(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+def create_backend(name: str = LLM_CACHE_BACKEND):
+    if name == "sqlite":
+        return SqliteBackend(LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES)
+    if name == "memory":
+        return MemoryBackend(LLM_CACHE_MAX_ENTRIES)
+    return None
+
+
+async def call_backend(backend, method, *args):
+    """디스크 I/O가 있는 백엔드(SQLite)는 스레드풀에서 실행해 이벤트 루프를 막지 않음"""
+    if backend.blocking:
+        return await run_in_threadpool(method, *args)
+    return method(*args)
+
+
+class LLMCache:
+    """모델 + 프롬프트 템플릿 버전 + 정규화된 입력을 키로 LLM 응답을 캐시"""
+
+    def __init__(self, backend=None, ttl: float = LLM_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    async def get(self, key: str):
+        if self.backend is None:
+            return None
+        value = await call_backend(self.backend, self.backend.get, key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str):
+        if self.backend is not None:
+            await call_backend(self.backend, self.backend.set, key, value, time.time() + self.ttl)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.backend is not None else None,
+            "entries": self.backend.size() if self.backend is not None else 0,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+        }
+
+
+llm_cache = LLMCache(create_backend())
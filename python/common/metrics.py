@@ -0,0 +1,185 @@
+"""단계별 지연 시간/카운터 수집과 요청 단위 타이밍 span
+
+- GET /metrics: Prometheus 텍스트 형식 (oncare_stage_seconds 히스토그램, LLM 호출/토큰 카운터, HTTP 요청 히스토그램)
+- 요청마다 X-Request-Id(없으면 traceparent의 trace-id, 둘 다 없으면 새로 생성)를 붙여 응답 헤더로 돌려주고,
+  요청 중 기록된 단계별 span을 Server-Timing 헤더와 로그 한 줄로 남긴다. Nest 쪽에서 같은 ID를 보내면 양쪽 로그를 묶어 볼 수 있다.
+- 값은 프로세스(워커)별로 집계된다. gunicorn 워커가 여러 개면 워커별로 수집해서 합산해야 한다.
+"""
+import os
+import re
+import time
+import uuid
+import threading
+import contextvars
+from contextlib import contextmanager
+
+METRICS_LOG_REQUESTS = os.getenv("METRICS_LOG_REQUESTS", "1") == "1"   # 요청별 span 요약 로그 출력 여부
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, float("inf"))
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    escaped = (f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in labels)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self._values = {}  # labels → [버킷별 개수, 합계, 개수]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    labels = _format_labels(key + (("le", _format_value(bound)),))
+                    lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {total!r}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+stage_seconds = Histogram("oncare_stage_seconds", "파이프라인 단계별 소요 시간(초)")
+http_request_seconds = Histogram("oncare_http_request_seconds", "HTTP 요청 처리 시간(초, 응답 헤더 전송까지)")
+llm_requests_total = Counter("oncare_llm_requests_total", "LLM 호출 수 (status: ok | error | rate_limited | cache_hit)")
+llm_tokens_total = Counter("oncare_llm_tokens_total", "LLM 토큰 사용량 (kind: prompt | completion)")
+
+REGISTRY = (stage_seconds, http_request_seconds, llm_requests_total, llm_tokens_total)
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# 요청 단위 컨텍스트: (request_id, span 리스트). 스레드풀로 넘어갈 때도 contextvars가 복사되면 같은 리스트에 기록된다.
+_request_context = contextvars.ContextVar("oncare_request_context", default=None)
+
+
+def current_request_id():
+    context = _request_context.get()
+    return context[0] if context else None
+
+
+def request_spans():
+    """현재 요청의 span 리스트 (요청 컨텍스트 밖이면 None). 다른 태스크가 이 요청 대신 기록할 때 사용"""
+    context = _request_context.get()
+    return context[1] if context else None
+
+
+def record_stage(stage: str, elapsed: float, spans: list = (), **labels):
+    """측정한 단계 시간을 히스토그램에 한 번 기록하고, 주어진 요청들의 span에 추가 (배치 추론처럼 여러 요청이 공유하는 단계용)"""
+    stage_seconds.observe(elapsed, stage=stage, **labels)
+    for request in spans:
+        request.append((stage, elapsed))
+
+
+@contextmanager
+def timed(stage: str, **labels):
+    """단계 소요 시간을 히스토그램에 기록하고, 요청 컨텍스트가 있으면 span으로도 남김 (동기/비동기 코드 모두 사용 가능)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans = request_spans()
+        record_stage(stage, time.perf_counter() - start, [spans] if spans is not None else (), **labels)
+
+
+_TRACEPARENT = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-[0-9a-f]{16}-[0-9a-f]{2}$")
+
+
+def request_id_from_headers(headers) -> str:
+    request_id = headers.get("x-request-id")
+    if request_id:
+        return request_id[:128]
+    match = _TRACEPARENT.match(headers.get("traceparent", ""))
+    if match:
+        return match.group(1)
+    return uuid.uuid4().hex
+
+
+def server_timing(spans: list) -> str:
+    """같은 단계가 여러 번이면 합산해서 Server-Timing 헤더 값으로 변환 (ms)"""
+    totals = {}
+    for stage, elapsed in spans:
+        totals[stage] = totals.get(stage, 0.0) + elapsed
+    return ", ".join(f"{re.sub(r'[^A-Za-z0-9_-]', '_', stage)};dur={elapsed * 1000:.1f}" for stage, elapsed in totals.items())
+
+
+def install_metrics(app):
+    """메인 앱에 요청 ID/span 미들웨어와 GET /metrics 엔드포인트를 등록"""
+    from starlette.responses import PlainTextResponse
+
+    @app.middleware("http")
+    async def request_metrics(request, call_next):
+        request_id = request_id_from_headers(request.headers)
+        spans = []
+        token = _request_context.set((request_id, spans))
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            response.headers["X-Request-Id"] = request_id
+            if spans:
+                response.headers["Server-Timing"] = server_timing(spans)
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            # 경로 전체 대신 마운트 단위(첫 경로 구간)로 집계해 라벨 수를 제한
+            prefix = "/" + request.url.path.strip("/").split("/", 1)[0]
+            http_request_seconds.observe(elapsed, method=request.method, prefix=prefix, status=str(status))
+            _request_context.reset(token)
+            if METRICS_LOG_REQUESTS and spans:
+                detail = " ".join(f"{stage}={seconds:.3f}" for stage, seconds in spans)
+                print(f"[요청 {request_id}] {request.method} {request.url.path} {status} {elapsed:.2f}초 {detail}")
+
+    @app.get("/metrics")
+    def metrics():
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
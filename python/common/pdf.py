@@ -0,0 +1,349 @@
+import atexit
+import os
+import platform
+import queue
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from common.metrics import timed
+
+# LibreOffice 변환 풀 설정
+LIBREOFFICE_BIN = os.getenv("LIBREOFFICE_BIN") or shutil.which("soffice") or "libreoffice"
+PDF_CONVERTER_INSTANCES = int(os.getenv("PDF_CONVERTER_INSTANCES", "2"))
+PDF_CONVERT_TIMEOUT = float(os.getenv("PDF_CONVERT_TIMEOUT", "120"))       # 변환 1건당 제한 시간(초)
+PDF_CONVERTER_START_TIMEOUT = float(os.getenv("PDF_CONVERTER_START_TIMEOUT", "60"))
+
+try:
+    # LibreOffice에 포함된 파이썬 UNO 바인딩 (있으면 상주 인스턴스에 이름 있는 파이프로 변환 요청)
+    import uno
+    from com.sun.star.beans import PropertyValue
+except ImportError:
+    uno = None
+
+
+def _file_url(path: str) -> str:
+    return "file://" + os.path.abspath(path).replace(os.sep, "/")
+
+
+def _kill_process_group(proc):
+    # soffice는 래퍼 스크립트 → soffice.bin 자식 프로세스로 실행되므로 프로세스 그룹 전체를 종료
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        proc.kill()
+
+
+def _props(**kwargs) -> tuple:
+    props = []
+    for name, value in kwargs.items():
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        props.append(prop)
+    return tuple(props)
+
+
+class OfficeInstance:
+    """전용 프로필을 가진 상주 LibreOffice 프로세스 하나 (UNO 파이프로 변환 요청)"""
+
+    def __init__(self, index: int, pipe_name: str, profile_dir: str):
+        self.index = index
+        self.pipe_name = pipe_name
+        self.profile_dir = profile_dir
+        self.proc = None
+        self.desktop = None
+        self.restarts = 0
+
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def ready(self) -> bool:
+        return self.alive() and self.desktop is not None
+
+    def start(self):
+        self.proc = subprocess.Popen([
+            LIBREOFFICE_BIN,
+            "--headless", "--invisible", "--nologo", "--norestore", "--nodefault", "--nolockcheck",
+            f"-env:UserInstallation={_file_url(self.profile_dir)}",
+            f"--accept=pipe,name={self.pipe_name};urp;StarOffice.ComponentContext",
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local)
+        deadline = time.monotonic() + PDF_CONVERTER_START_TIMEOUT
+        while True:
+            try:
+                ctx = resolver.resolve(f"uno:pipe,name={self.pipe_name};urp;StarOffice.ComponentContext")
+                self.desktop = ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+                return
+            except Exception:
+                if not self.alive() or time.monotonic() > deadline:
+                    self.kill()
+                    raise Exception(f"LibreOffice 인스턴스 기동 실패 (pipe {self.pipe_name})")
+                time.sleep(0.2)
+
+    def restart(self):
+        self.kill()
+        self.restarts += 1
+        self.start()
+
+    def kill(self):
+        self.desktop = None
+        if self.alive():
+            _kill_process_group(self.proc)
+            self.proc.wait()
+
+    def convert(self, docx_path: str, pdf_path: str):
+        doc = self.desktop.loadComponentFromURL(_file_url(docx_path), "_blank", 0, _props(Hidden=True))
+        try:
+            doc.storeToURL(_file_url(pdf_path), _props(FilterName="writer_pdf_Export"))
+        finally:
+            doc.close(True)
+
+    def convert_many(self, pairs: list) -> list:
+        """[(docx, pdf), ...]를 순서대로 변환하고 파일별 예외(성공 시 None) 리스트를 반환"""
+        errors = []
+        for docx_path, pdf_path in pairs:
+            if not self.ready():
+                # 변환 도중 인스턴스가 죽었으면(시간 초과 등) 나머지는 실패 처리
+                errors.append(Exception("LibreOffice 인스턴스가 종료되었습니다."))
+                continue
+            try:
+                self.convert(docx_path, pdf_path)
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+        return errors
+
+
+class SubprocessInstance:
+    """UNO 바인딩이 없는 환경용: 변환마다 soffice를 실행하되 인스턴스별 전용 프로필을 재사용"""
+
+    def __init__(self, index: int, pipe_name: str, profile_dir: str):
+        self.index = index
+        self.profile_dir = profile_dir
+        self.proc = None
+        self.restarts = 0
+
+    def alive(self) -> bool:
+        return True
+
+    def ready(self) -> bool:
+        return True
+
+    def start(self):
+        pass
+
+    def restart(self):
+        self.restarts += 1
+
+    def kill(self):
+        if self.proc is not None and self.proc.poll() is None:
+            _kill_process_group(self.proc)
+
+    def convert(self, docx_path: str, pdf_path: str):
+        error = self.convert_many([(docx_path, pdf_path)])[0]
+        if error is not None:
+            raise error
+
+    def convert_many(self, pairs: list) -> list:
+        """출력 디렉토리별로 soffice를 한 번만 실행해 여러 파일을 변환 (파일별 예외 리스트 반환)"""
+        groups = {}
+        for i, (docx_path, pdf_path) in enumerate(pairs):
+            groups.setdefault(os.path.dirname(os.path.abspath(pdf_path)), []).append(i)
+        errors = [None] * len(pairs)
+        for output_dir, indexes in groups.items():
+            self.proc = subprocess.Popen([
+                LIBREOFFICE_BIN,
+                "--headless", "--norestore", "--nolockcheck",
+                f"-env:UserInstallation={_file_url(self.profile_dir)}",
+                "--convert-to", "pdf",
+                "--outdir", output_dir,
+                *[pairs[i][0] for i in indexes]
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, start_new_session=True)
+            _, stderr = self.proc.communicate()
+            message = stderr.decode("utf-8", errors="ignore").strip() or f"exit code {self.proc.returncode}"
+            for i in indexes:
+                docx_path, pdf_path = pairs[i]
+                # libreoffice는 입력 파일명 기준으로 pdf를 생성하므로 요청한 경로로 맞춰줌
+                produced = os.path.join(output_dir, os.path.splitext(os.path.basename(docx_path))[0] + ".pdf")
+                if not os.path.exists(produced):
+                    errors[i] = Exception(f"PDF 파일이 생성되지 않았습니다: {message}")
+                elif os.path.abspath(produced) != os.path.abspath(pdf_path):
+                    os.replace(produced, pdf_path)
+        return errors
+
+
+class OfficePool:
+    """LibreOffice 인스턴스 풀
+
+    - 인스턴스마다 전용 프로필 디렉토리를 사용해 동시 변환 시 프로필 충돌이 없다.
+    - 변환 요청은 큐로 들어가고, 인스턴스별 워커 스레드가 하나씩 꺼내 처리한다.
+    - 변환이 timeout을 넘기면 인스턴스를 강제 종료하고, 죽은 인스턴스는 다음 작업 전에 재시작한다.
+    """
+
+    def __init__(self, size: int = PDF_CONVERTER_INSTANCES, timeout: float = PDF_CONVERT_TIMEOUT):
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.instance_class = OfficeInstance if uno is not None else SubprocessInstance
+        self.instances = []
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._profile_root = None
+        self.jobs = 0
+        self.failures = 0
+        self.timeouts = 0
+
+    def _ensure_started(self):
+        with self._lock:
+            if self.instances:
+                return
+            self._profile_root = tempfile.mkdtemp(prefix="office-pool-")
+            for index in range(self.size):
+                instance = self.instance_class(
+                    index,
+                    # 연결 이름에 PID를 넣어 gunicorn 워커마다 자기 인스턴스에만 연결 (고정 포트는 워커 간에 겹침)
+                    f"oncare-office-{os.getpid()}-{index}",
+                    os.path.join(self._profile_root, f"profile-{index}"),
+                )
+                self.instances.append(instance)
+                threading.Thread(target=self._worker, args=(instance,), name=f"office-{index}", daemon=True).start()
+            atexit.register(self.shutdown)
+
+    def convert(self, docx_path: str, pdf_path: str, timeout: float = None):
+        """변환이 끝날 때까지 대기 (실패/시간 초과 시 예외)"""
+        error = self.convert_many([(docx_path, pdf_path)], timeout)[0]
+        if error is not None:
+            raise error
+        return pdf_path
+
+    def convert_many(self, pairs: list, timeout: float = None) -> list:
+        """여러 파일을 인스턴스 수만큼 묶음으로 나눠 동시에 변환 (파일별 예외, 성공 시 None)"""
+        if not pairs:
+            return []
+        self._ensure_started()
+        group_size = -(-len(pairs) // self.size)
+        groups = []
+        for i in range(0, len(pairs), group_size):
+            future = Future()
+            self._queue.put((pairs[i:i + group_size], timeout or self.timeout, future))
+            groups.append(future)
+        return [error for future in groups for error in future.result()]
+
+    def _worker(self, instance):
+        while True:
+            pairs, timeout, future = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            timed_out = threading.Event()
+
+            def on_timeout():
+                timed_out.set()
+                instance.kill()
+
+            # 묶음 변환은 파일 수만큼 제한 시간을 늘림
+            timer = threading.Timer(timeout * len(pairs), on_timeout)
+            try:
+                if not instance.ready():
+                    # 최초 기동 또는 비정상 종료(크래시/시간 초과)된 인스턴스 재시작
+                    if instance.proc is None:
+                        instance.start()
+                    else:
+                        instance.restart()
+                timer.start()
+                errors = instance.convert_many(pairs)
+            except Exception as e:
+                traceback.print_exc()
+                errors = [e] * len(pairs)
+            finally:
+                timer.cancel()
+            if timed_out.is_set():
+                self.timeouts += 1
+                errors = [
+                    Exception(f"PDF 변환 시간 초과({timeout:.0f}초)") if error is not None else None
+                    for error in errors
+                ]
+            self.jobs += sum(1 for error in errors if error is None)
+            self.failures += sum(1 for error in errors if error is not None)
+            future.set_result(errors)
+
+    def shutdown(self):
+        for instance in self.instances:
+            try:
+                instance.kill()
+            except Exception:
+                pass
+        if self._profile_root:
+            shutil.rmtree(self._profile_root, ignore_errors=True)
+
+    def stats(self) -> dict:
+        return {
+            "mode": "uno" if uno is not None else "subprocess",
+            "instances": self.size,
+            "alive": sum(1 for instance in self.instances if instance.alive()),
+            "restarts": sum(instance.restarts for instance in self.instances),
+            "queue_depth": self._queue.qsize(),
+            "jobs": self.jobs,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+        }
+
+
+office_pool = OfficePool()
+
+
+def convert_docx_to_pdf(docx_path, pdf_path):
+    with timed("pdf_convert"):
+        _convert_docx_to_pdf(docx_path, pdf_path)
+
+
+def _convert_docx_to_pdf(docx_path, pdf_path):
+    if platform.system() == "Windows":
+        try:
+            from docx2pdf import convert
+            convert(docx_path, pdf_path)
+        except Exception as e:
+            raise Exception(f"docx2pdf(MS Word) PDF 변환 실패(Windows): {e}")
+    else:
+        try:
+            office_pool.convert(docx_path, pdf_path)
+        except Exception as e:
+            raise Exception(f"LibreOffice PDF 변환 실패(Linux/Unix): {e}")
+
+
+def convert_docx_to_pdf_many(pairs: list) -> list:
+    """[(docx, pdf), ...] 일괄 변환. 파일별 예외(성공 시 None) 리스트를 입력 순서대로 반환"""
+    with timed("pdf_convert_batch"):
+        return _convert_docx_to_pdf_many(pairs)
+
+
+def _convert_docx_to_pdf_many(pairs: list) -> list:
+    if platform.system() == "Windows":
+        errors = []
+        for docx_path, pdf_path in pairs:
+            try:
+                convert_docx_to_pdf(docx_path, pdf_path)
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+        return errors
+    return [
+        Exception(f"LibreOffice PDF 변환 실패(Linux/Unix): {error}") if error is not None else None
+        for error in office_pool.convert_many(pairs)
+    ]
+
+
+def convert_docx_bytes_to_pdf(docx_bytes: bytes, name: str = "document") -> bytes:
+    """메모리의 docx를 pdf 바이트로 변환 (LibreOffice 입력용 임시 디렉토리만 사용하고 바로 정리)"""
+    with tempfile.TemporaryDirectory(prefix="pdf-") as tmpdir:
+        docx_path = os.path.join(tmpdir, f"{name}.docx")
+        pdf_path = os.path.join(tmpdir, f"{name}.pdf")
+        with open(docx_path, "wb") as f:
+            f.write(docx_bytes)
+        convert_docx_to_pdf(docx_path, pdf_path)
+        with open(pdf_path, "rb") as f:
+            return f.read()
@@ -0,0 +1,181 @@
+import os
+import io
+import time
+import threading
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import boto3
+from botocore.config import Config
+from boto3.s3.transfer import TransferConfig
+from common.metrics import timed
+
+BUCKET_NAME = os.getenv("S3_BUCKET", "oncare-backend")
+S3_REGION = os.getenv("S3_REGION", "ap-northeast-2")
+# 로컬 S3 대체 서버(MinIO, moto 등) 주소. 지정하면 경로 방식 주소로 접근
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL") or None
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "32"))
+S3_UPLOAD_WORKERS = int(os.getenv("S3_UPLOAD_WORKERS", "16"))
+S3_PRESIGN_EXPIRES = int(os.getenv("S3_PRESIGN_EXPIRES", str(60 * 10)))          # 10분
+# 만료까지 남은 시간이 이보다 짧으면 새로 서명 (다운로드 도중 만료되지 않도록)
+S3_PRESIGN_REFRESH_MARGIN = int(os.getenv("S3_PRESIGN_REFRESH_MARGIN", "120"))
+S3_PRESIGN_CACHE_MAX_ENTRIES = int(os.getenv("S3_PRESIGN_CACHE_MAX_ENTRIES", "10000"))
+
+# 문서 파일은 작으므로 업로드마다 전송 스레드를 만들지 않고 단일 요청으로 보냄 (동시성은 s3_executor가 담당)
+TRANSFER_CONFIG = TransferConfig(use_threads=False)
+
+_client = None
+_client_lock = threading.Lock()
+
+# 업로드/다운로드 동시 실행용 공유 풀
+s3_executor = ThreadPoolExecutor(max_workers=S3_UPLOAD_WORKERS, thread_name_prefix="s3")
+
+
+def get_s3_client():
+    """프로세스 전체에서 공유하는 S3 클라이언트 (boto3 클라이언트는 스레드 안전, 세션 생성만 잠금으로 보호)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = boto3.session.Session().client(
+                    "s3",
+                    region_name=S3_REGION,
+                    endpoint_url=S3_ENDPOINT_URL,
+                    config=Config(
+                        max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+                        retries={"max_attempts": 5, "mode": "adaptive"},
+                        s3={"addressing_style": "path"} if S3_ENDPOINT_URL else None,
+                    ),
+                )
+    return _client
+
+
+def object_url(key: str) -> str:
+    if S3_ENDPOINT_URL:
+        return f"{S3_ENDPOINT_URL.rstrip('/')}/{BUCKET_NAME}/{key}"
+    return f"https://{BUCKET_NAME}.s3.amazonaws.com/{key}"
+
+
+def upload_bytes(key: str, data: bytes, metadata: dict = None) -> str:
+    extra_args = {"Metadata": metadata} if metadata else None
+    with timed("s3_upload"):
+        get_s3_client().upload_fileobj(io.BytesIO(data), BUCKET_NAME, key, ExtraArgs=extra_args, Config=TRANSFER_CONFIG)
+    return object_url(key)
+
+
+def upload_bytes_many(items: list) -> list:
+    """[(key, bytes[, metadata]), ...]를 동시에 업로드하고, 입력 순서대로 오류 목록(성공 시 None)을 반환"""
+    # 요청 컨텍스트(요청 ID/span)를 업로드 스레드로 전달
+    futures = [s3_executor.submit(contextvars.copy_context().run, upload_bytes, *item) for item in items]
+    errors = []
+    for future in futures:
+        try:
+            future.result()
+            errors.append(None)
+        except Exception as e:
+            errors.append(e)
+    return errors
+
+
+def download_bytes(key: str) -> bytes:
+    buffer = io.BytesIO()
+    with timed("s3_download"):
+        get_s3_client().download_fileobj(BUCKET_NAME, key, buffer, Config=TRANSFER_CONFIG)
+    return buffer.getvalue()
+
+
+def head_object(key: str):
+    """객체 메타데이터 반환 (없으면 None)"""
+    from botocore.exceptions import ClientError
+    try:
+        return get_s3_client().head_object(Bucket=BUCKET_NAME, Key=key)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+
+
+def download_file(key: str, path: str):
+    with timed("s3_download"):
+        get_s3_client().download_file(BUCKET_NAME, key, path, Config=TRANSFER_CONFIG)
+
+
+def upload_file(path: str, key: str) -> str:
+    with timed("s3_upload"):
+        get_s3_client().upload_file(path, BUCKET_NAME, key, Config=TRANSFER_CONFIG)
+    return object_url(key)
+
+
+class PresignedUrlCache:
+    """키별 presigned URL을 만료 직전(S3_PRESIGN_REFRESH_MARGIN)까지 재사용하는 LRU 캐시"""
+
+    def __init__(self, max_entries: int = S3_PRESIGN_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key → (url, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, expires_in: int = S3_PRESIGN_EXPIRES) -> str:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] - S3_PRESIGN_REFRESH_MARGIN > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        url = get_s3_client().generate_presigned_url(
+            ClientMethod="get_object",
+            Params={"Bucket": BUCKET_NAME, "Key": key},
+            ExpiresIn=expires_in,
+        )
+        with self._lock:
+            self._entries[key] = (url, now + expires_in)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return url
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+        }
+
+
+presigned_urls = PresignedUrlCache()
+
+
+def presigned_url(key: str) -> str:
+    return presigned_urls.get(key)
+
+
+def sign_file_names(prefix: str, file_names: list, pdf_key=None) -> dict:
+    """파일명 목록을 확장자별 경로({prefix}/docx|pdf/{파일명})로 한 번에 서명
+
+    서명은 네트워크 없이 로컬에서 계산되므로 순차 처리. 파일명별 URL과 실패한 파일명의 오류를 반환
+    pdf_key(prefix, 파일명)를 주면 PDF 경로를 그 함수로 찾고, None이면 아직 생성되지 않은 것으로 pending에 넣는다.
+    """
+    urls = {}
+    errors = {}
+    pending = []
+    for name in dict.fromkeys(n.strip() for n in file_names if n.strip()):
+        ext = os.path.splitext(name)[1].lower().lstrip(".")
+        if ext not in ("docx", "pdf"):
+            errors[name] = "지원하지 않는 파일 형식입니다."
+            continue
+        try:
+            key = f"{prefix}/{ext}/{name}"
+            if ext == "pdf" and pdf_key is not None:
+                key = pdf_key(prefix, name)
+                if key is None:
+                    pending.append(name)
+                    continue
+            urls[name] = presigned_url(key)
+        except Exception as e:
+            errors[name] = str(e)
+    return {"urls": urls, "errors": errors, "pending": pending}
@@ -0,0 +1,64 @@
+import copy
+import io
+import os
+import threading
+from docx import Document
+from docxtpl import DocxTemplate
+from common.metrics import timed
+
+# 템플릿(.docx) 위치. 기본값은 python/ 디렉토리 (실행 위치(CWD)와 무관)
+TEMPLATE_DIR = os.getenv("TEMPLATE_DIR", os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+class TemplateRegistry:
+    """docx 템플릿을 한 번만 파싱해 두고, 렌더링마다 파싱된 문서를 복제해서 사용
+
+    파일이 바뀌면(mtime/크기 변경) 다음 요청 때 다시 파싱한다.
+    """
+
+    def __init__(self, base_dir: str = TEMPLATE_DIR):
+        self.base_dir = base_dir
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _document(self, name: str):
+        path = os.path.join(self.base_dir, name)
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._cache.get(name)
+            if cached is None or cached[0] != version:
+                cached = (version, Document(path))
+                self._cache[name] = cached
+            return path, cached[1]
+
+    def get(self, name: str) -> DocxTemplate:
+        """렌더링 가능한 새 DocxTemplate 반환 (캐시된 원본은 변경되지 않음)"""
+        path, document = self._document(name)
+        tpl = DocxTemplate(path)
+        tpl.docx = copy.deepcopy(document)
+        return tpl
+
+    def render(self, name: str, context: dict) -> DocxTemplate:
+        with timed("template_render"):
+            tpl = self.get(name)
+            tpl.render(context)
+        return tpl
+
+    def render_to_bytes(self, name: str, context: dict, cleanups: tuple = ()) -> bytes:
+        """렌더링 → 메모리의 문서 객체에 후처리(cleanups) 적용 → docx로 한 번만 직렬화"""
+        tpl = self.render(name, context)
+        for cleanup in cleanups:
+            cleanup(tpl.docx)
+        return to_bytes(tpl)
+
+
+def to_bytes(document) -> bytes:
+    """DocxTemplate/Document를 디스크를 거치지 않고 docx 바이트로 직렬화"""
+    with timed("docx_serialize"):
+        buffer = io.BytesIO()
+        document.save(buffer)
+        return buffer.getvalue()
+
+
+templates = TemplateRegistry()
@@ -0,0 +1,40 @@
+# gunicorn -c gunicorn.conf.py main:app  (python/ 디렉토리에서 실행)
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "300"))
+
+# 작업 상태(GET /jobs/{id})는 어느 워커로 폴링이 가도 조회되도록 워커 간에 공유되어야 함
+if workers > 1:
+    os.environ.setdefault("JOB_STORE", "sqlite")
+    if os.environ["JOB_STORE"].lower() == "memory":
+        raise RuntimeError("JOB_STORE=memory는 워커가 1개일 때만 사용할 수 있습니다. (WEB_CONCURRENCY=1 또는 JOB_STORE=sqlite)")
+
+# STT_SHARED_WEIGHTS=1(기본): master가 fork 이전에 Whisper 가중치를 한 번만 로드하고
+# 워커들은 copy-on-write로 같은 물리 페이지를 공유한다. (워커 수만큼 메모리가 늘지 않음)
+shared_weights = os.getenv("STT_SHARED_WEIGHTS", "1") == "1"
+preload_app = shared_weights
+
+
+def when_ready(server):
+    # preload_app 이후, 워커 fork 이전에 master에서 실행됨
+    if not shared_weights:
+        return
+    from main import SERVICES
+    if "stt" not in SERVICES:
+        return
+    from stt.executor import STT_EXECUTOR
+    if STT_EXECUTOR == "process":
+        # 추론 프로세스(spawn)가 각자 가중치를 로드하므로 master에서 로드하면 사용되지 않는 사본만 남음
+        return
+    from stt.service import model_manager
+    # 워밍업(추론)은 master에서 하지 않음: OpenMP 스레드 풀이 fork 이후 자식에서 멈출 수 있음
+    model_manager.load(warmup=False)
+    server.log.info("STT 가중치 master 로드 완료 (pid %s)", os.getpid())
+
+
+def post_worker_init(worker):
+    from stt.memory import process_memory
+    worker.log.info("워커 메모리: %s", process_memory())
@@ -1,12 +1,23 @@
+import os
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from stt.service import create_stt_app
-from report.service import create_report_app
-from weekly_report.service import create_weekly_report_app
+from common.metrics import install_metrics
+
+# 이 프로세스에서 서빙할 서비스 목록 (예: SERVICES=report,weekly_report 이면 STT 모델을 로드하지 않음)
+SERVICES = [s.strip() for s in os.getenv("SERVICES", "stt,report,weekly_report").split(",") if s.strip()]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 마운트된 하위 앱의 lifespan은 실행되지 않으므로 STT 모델 로드는 메인 앱에서 시작
+    if "stt" in SERVICES:
+        from stt.service import start_stt_model
+        start_stt_model()
+    yield
 
 def create_app() -> FastAPI:
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
     
     # CORS 설정
     app.add_middleware(
@@ -17,17 +28,26 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # 요청 ID/단계별 span 미들웨어와 GET /metrics (STT·리포트 파이프라인 단계별 히스토그램/카운터)
+    install_metrics(app)
+
     # STT 서비스 마운트
-    stt_app = create_stt_app()
-    app.mount("/transcribe", stt_app)
+    if "stt" in SERVICES:
+        from stt.service import create_stt_app
+        stt_app = create_stt_app()
+        app.mount("/transcribe", stt_app)
 
     # 리포트 서비스 마운트
-    report_app = create_report_app()
-    app.mount("/generate-journal-docx", report_app)
+    if "report" in SERVICES:
+        from report.service import create_report_app
+        report_app = create_report_app()
+        app.mount("/generate-journal-docx", report_app)
 
     # 주간보고서 서비스 마운트
-    weekly_report_app = create_weekly_report_app()
-    app.mount("/generate-weekly-report", weekly_report_app)
+    if "weekly_report" in SERVICES:
+        from weekly_report.service import create_weekly_report_app
+        weekly_report_app = create_weekly_report_app()
+        app.mount("/generate-weekly-report", weekly_report_app)
 
     return app
 
@@ -38,4 +58,4 @@ def read_root():
     return {"message": "Hello World"}
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="localhost", port=5000)
\ No newline at end of file
+    uvicorn.run(app, host="localhost", port=5000)
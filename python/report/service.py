@@ -1,24 +1,27 @@
 import os
 from fastapi import FastAPI, Body, HTTPException
 from pydantic import BaseModel
-from docxtpl import DocxTemplate
 from fastapi.middleware.cors import CORSMiddleware
-from openai import OpenAI
 import uuid
 import json
 import time
-import subprocess
-import boto3
 import tempfile
-import platform
+import asyncio
+from starlette.concurrency import run_in_threadpool
+from concurrent.futures import ThreadPoolExecutor
+from common.pdf import convert_docx_to_pdf, convert_docx_bytes_to_pdf, convert_docx_to_pdf_many, office_pool
+from common.templates import templates, to_bytes
+from common.llm import chat, estimate_tokens, split_by_tokens
+from common.llm_cache import llm_cache
+from common.jobs import job_manager
+from common.lazy_pdf import CONTENT_HASH_METADATA, DOCUMENT_PDF_MODE, docx_content_hash, download_pdf_key, lazy_pdfs, listing_pdf_key
+from common.s3 import download_file, object_url, presigned_urls, presigned_url, sign_file_names, upload_bytes_many, upload_file
 
 # 개발 환경에서만 dotenv 사용
 if os.environ.get("ENV", "local") == "local":
     from dotenv import load_dotenv
     load_dotenv(dotenv_path=os.path.abspath(os.path.join(os.path.dirname(__file__), '../../.env')))
 
-client = OpenAI()
-
 class JournalRequest(BaseModel):
     text: str
     editedTranscript: str = None
@@ -35,38 +38,212 @@ class JournalRequest(BaseModel):
     opinion: str = ""
     result: str = ""    
     note: str = ""
+    bypassCache: bool = False  # True면 LLM 응답 캐시를 사용하지 않고 새로 생성
+    callbackUrl: str = None    # 작업 모드(/jobs)에서 단계 완료/종료 시 상태를 POST할 URL
 
 class PdfConvertRequest(BaseModel):
     file_name: str
 
+class PdfBatchConvertRequest(BaseModel):
+    file_names: list[str]
+
+# 일괄 변환 시 S3 다운로드/업로드 동시 실행 수
+PDF_BATCH_CONCURRENCY = int(os.getenv("PDF_BATCH_CONCURRENCY", "8"))
+
 class FileDownloadRequest(BaseModel):
     file_name: str
 
-def convert_docx_to_pdf(docx_path, pdf_path):
-    if platform.system() == "Windows":
-        try:
-            from docx2pdf import convert
-            convert(docx_path, pdf_path)
-        except Exception as e:
-            raise Exception(f"docx2pdf(MS Word) PDF 변환 실패(Windows): {e}")
+class FileDownloadBatchRequest(BaseModel):
+    file_names: list[str]  # 확장자(.docx/.pdf)로 S3 경로를 구분
+
+# 프롬프트 템플릿 버전 (프롬프트 문구를 바꾸면 올려서 이전 캐시를 무효화)
+SUMMARY_PROMPT_VERSION = "journal-summary:2"
+META_PROMPT_VERSION = "journal-meta:1"
+SEGMENT_PROMPT_VERSION = "journal-segment:1"
+
+def summary_messages(transcript: str) -> list:
+    """상담내용(요약) 생성 프롬프트"""
+    summary_prompt = (
+        f"당신은 복지기관에서 사용하는 상담 보고서 요약을 작성하는 역할입니다.\n\n"
+        f"당신에게 제공된 상담 원문을 바탕으로 대상자의 상태를 자연스럽고 정확하게 요약하세요.\n\n"
+        f"❗️다음 조건을 반드시 지켜주세요:\n"
+        f"- 문장은 '대상자님은 ~하고 계십니다'와 같이 3인칭 존칭 시점으로 작성하세요.\n"
+        f"- 첫 문장은 '네,', '안녕하세요' 등으로 시작하지 마세요. → ❌\n"
+        f"- '~입니다.', '~있습니다.', '~어려워하고 계십니다.'와 같이 자연스럽고 진단적인 톤을 사용하세요.\n"
+        f"- GPT형 멘트(예: 요약해 드리겠습니다)는 쓰지 마세요. → ❌\n"
+        f"- 한 문단으로 작성하며, 항목 구분이나 줄바꿈 없이 매끄럽게 연결된 문장으로 서술하세요."
+    )
+    return [
+        {"role": "system", "content": summary_prompt},
+        {"role": "user", "content": transcript}
+    ]
+
+def meta_messages(transcript: str) -> list:
+    """상담내용(요약)을 제외한 나머지 항목을 JSON으로 생성하는 프롬프트"""
+    meta_prompt = (
+        "아래 상담 대화 원문을 바탕으로 상담일지의 모든 항목(상담일자, 서비스, 담당자, 상담유형, 상담방법, 상담시간, 상담제목, 구분, 대상자, 연락처, 조치사항, 상담자의견, 상담결과, 비고)을 아래 JSON 형식으로 만들어줘. "
+        "상담내용(요약)은 이미 따로 생성했으니 제외해도 돼. "
+        "각 항목은 대화에 정보가 없더라도 상담의 흐름과 맥락을 바탕으로 반드시 추정해서 한 문장 이상으로 작성해줘. "
+        "특히 상담결과, 조치사항, 상담자의견, 비고 등은 빈 문자열로 두지 말고, 대화에서 유추해서라도 반드시 채워줘. "
+        "상담일자, 서비스, 담당자 등 명확히 알 수 없는 항목은 '정보 없음'으로 채워줘.\n"
+        "단, '연락처' 항목은 반드시 입력값 그대로 사용해줘.\n"
+        "{\n"
+        "  \"상담일자\": \"\",\n"
+        "  \"서비스\": \"\",\n"
+        "  \"담당자\": \"\",\n"
+        "  \"상담유형\": \"\",\n"
+        "  \"상담방법\": \"\",\n"
+        "  \"상담시간\": \"\",\n"
+        "  \"상담제목\": \"\",\n"
+        "  \"구분\": \"\",\n"
+        "  \"대상자\": \"\",\n"
+        "  \"연락처\": \"입력값 그대로\",\n"
+        "  \"조치사항\": \"\",\n"
+        "  \"상담자의견\": \"\",\n"
+        "  \"상담결과\": \"\",\n"
+        "  \"비고\": \"\"\n"
+        "}\n"
+        "상담 대화:\n" + transcript
+    )
+    return [{"role": "system", "content": meta_prompt}]
+
+# 긴 상담 원문 처리(map-reduce) 기준
+LONG_TRANSCRIPT_TOKENS = int(os.getenv("LONG_TRANSCRIPT_TOKENS", "8000"))    # 이보다 길면 구간별 요약 후 병합
+TRANSCRIPT_SEGMENT_TOKENS = int(os.getenv("TRANSCRIPT_SEGMENT_TOKENS", "3000"))
+TRANSCRIPT_MAP_CONCURRENCY = int(os.getenv("TRANSCRIPT_MAP_CONCURRENCY", "4"))
+
+def segment_notes_messages(segment: str, index: int, total: int) -> list:
+    """긴 상담 원문의 한 구간을 사실 위주로 압축하는 프롬프트 (map 단계)"""
+    prompt = (
+        f"아래는 복지기관 상담 대화 원문을 {total}개 구간으로 나눈 것 중 {index}번째 구간입니다.\n"
+        "이 구간에서 드러난 대상자의 건강 상태, 정서 상태, 생활 상황, 요청 사항, 상담자의 안내/조치, "
+        "날짜·시간·서비스·담당자 등 상담일지 작성에 필요한 사실을 빠짐없이 간결한 문장으로 정리하세요.\n"
+        "- 원문에 없는 내용은 추측하지 마세요.\n"
+        "- 인사말, 반복, 잡담은 제외하세요.\n"
+        "- 설명 없이 정리한 내용만 출력하세요."
+    )
+    return [
+        {"role": "system", "content": prompt},
+        {"role": "user", "content": segment}
+    ]
+
+async def condense_transcript(transcript: str, bypass_cache: bool = False) -> str:
+    """원문을 토큰 기준 구간으로 나눠 병렬 요약(map)한 뒤, 구간 요약들을 하나의 입력으로 합침(reduce 입력)"""
+    segments = split_by_tokens(transcript, TRANSCRIPT_SEGMENT_TOKENS)
+    semaphore = asyncio.Semaphore(TRANSCRIPT_MAP_CONCURRENCY)
+
+    async def summarize(index, segment):
+        async with semaphore:
+            return await chat(
+                segment_notes_messages(segment, index, len(segments)),
+                cache_version=SEGMENT_PROMPT_VERSION,
+                bypass_cache=bypass_cache,
+            )
+
+    notes = await asyncio.gather(*[summarize(i, segment) for i, segment in enumerate(segments, 1)])
+    return "아래는 긴 상담 대화를 시간 순서대로 구간별 정리한 내용입니다.\n\n" + "\n\n".join(
+        f"[구간 {i}] {note.strip()}" for i, note in enumerate(notes, 1)
+    )
+
+async def generate_journal_fields(transcript: str, bypass_cache: bool = False):
+    """요약/항목 프롬프트는 서로 독립이므로 동시에 호출 (지연 시간 ≈ GPT 왕복 1회)
+
+    원문이 LONG_TRANSCRIPT_TOKENS보다 길면 구간별 정리본을 만들어 두 프롬프트의 입력으로 사용
+    """
+    tokens = estimate_tokens(transcript)
+    if tokens > LONG_TRANSCRIPT_TOKENS:
+        print(f"긴 상담 원문 모드: 약 {tokens}토큰 → 구간별 요약 후 병합")
+        transcript = await condense_transcript(transcript, bypass_cache)
+    summary, meta_content = await asyncio.gather(
+        chat(summary_messages(transcript), cache_version=SUMMARY_PROMPT_VERSION, bypass_cache=bypass_cache),
+        chat(meta_messages(transcript), cache_version=META_PROMPT_VERSION, bypass_cache=bypass_cache, validate=json.loads),
+    )
+    return summary, json.loads(meta_content)
+
+def render_journal_docx(meta_json: dict):
+    """템플릿 렌더링 (파싱된 템플릿 복제 → 메모리에서 docx 생성) 후 (파일명, docx 바이트) 반환"""
+    filename = f"journal-{uuid.uuid4()}.docx"
+    try:
+        tpl = templates.render("상담일지양식.docx", meta_json)
+        return filename, to_bytes(tpl)
+    except Exception as e:
+        print("[템플릿 렌더링 에러]", str(e))
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"템플릿 렌더링 중 오류: {str(e)}")
+
+def convert_journal_pdf_bytes(filename: str, docx_bytes: bytes) -> bytes:
+    try:
+        return convert_docx_bytes_to_pdf(docx_bytes, filename[:-len('.docx')])
+    except Exception as e:
+        import traceback
+        print(f"[PDF 변환 오류] {e}")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"PDF 변환 중 오류: {str(e)}")
+
+def upload_journal_files(filename: str, docx_bytes: bytes, pdf_bytes: bytes = None):
+    """docx/pdf를 메모리 버퍼에서 S3로 동시 업로드 후 (docx URL, pdf URL) 반환
+
+    pdf_bytes가 없으면(lazy 모드) docx만 내용 해시 메타데이터와 함께 업로드하고, PDF는 첫 다운로드 요청 시 생성
+    (아직 PDF가 없으므로 pdf URL은 None, 다운로드는 /download-pdf-url로)
+    """
+    docx_s3_key = f"journal/docx/{filename}"
+    pdf_s3_key = f"journal/pdf/{filename.replace('.docx', '.pdf')}"
+    if pdf_bytes is None:
+        items = [(docx_s3_key, docx_bytes, {CONTENT_HASH_METADATA: docx_content_hash(docx_bytes)})]
+        labels = ("DOCX",)
     else:
-        output_dir = os.path.dirname(pdf_path)
-        try:
-            subprocess.run([
-                "libreoffice",
-                "--headless",
-                "--convert-to", "pdf",
-                "--outdir", output_dir,
-                docx_path
-            ], check=True)
-        except Exception as e:
-            raise Exception(f"LibreOffice PDF 변환 실패(Linux/Unix): {e}")
-    # libreoffice는 파일명을 자동으로 맞춰줌
-    # 변환된 파일이 output_dir에 생성됨
+        items = [(docx_s3_key, docx_bytes), (pdf_s3_key, pdf_bytes)]
+        labels = ("DOCX", "PDF")
+    for label, error in zip(labels, upload_bytes_many(items)):
+        if error is not None:
+            print(f"[S3 업로드 중 에러 - {label}]", str(error))
+            raise HTTPException(status_code=500, detail=f"S3 {label} 업로드 중 오류: {str(error)}")
+    return object_url(docx_s3_key), object_url(pdf_s3_key) if pdf_bytes is not None else None
+
+async def build_journal(data: JournalRequest, job=None) -> dict:
+    """상담일지 생성 파이프라인 (llm → render → pdf → upload)
+
+    각 단계는 job_manager의 단계별 동시 실행 제한을 받고, job이 있으면 진행 상황이 기록된다.
+    블로킹 단계(렌더링/변환/업로드)는 스레드풀에서 실행 (이벤트 루프는 다른 요청 처리)
+    """
+    # editedTranscript가 None/빈문자/공백일 때도 안전하게 처리
+    transcript = data.text
+    if data.editedTranscript and data.editedTranscript.strip() != "":
+        transcript = data.editedTranscript
+    # 1~2. 상담내용(요약)과 나머지 항목(JSON)을 동시에 생성
+    async with job_manager.stage(job, "llm"):
+        summary, meta_json = await generate_journal_fields(transcript, data.bypassCache)
+
+    # 3. 상담내용(요약)만 summary로 대체
+    meta_json["상담내용"] = summary
+
+    # 4. 연락처를 입력값 그대로 덮어쓰기
+    meta_json["연락처"] = data.contact
+
+    # 5. 렌더링 → PDF 변환 → S3 업로드
+    async with job_manager.stage(job, "render"):
+        filename, docx_bytes = await run_in_threadpool(render_journal_docx, meta_json)
+    pdf_bytes = None
+    if DOCUMENT_PDF_MODE != "lazy":
+        async with job_manager.stage(job, "pdf"):
+            pdf_bytes = await run_in_threadpool(convert_journal_pdf_bytes, filename, docx_bytes)
+    async with job_manager.stage(job, "upload"):
+        docx_url, pdf_url = await run_in_threadpool(upload_journal_files, filename, docx_bytes, pdf_bytes)
+
+    return {
+        "file": filename,
+        "docx_url": docx_url,
+        "pdf_url": pdf_url,
+        "summary": summary,
+        "recommendations": meta_json["조치사항"],
+        "opinion": meta_json["상담자의견"],
+        "result": meta_json["상담결과"],
+        "note": meta_json["비고"]
+    }
 
 def create_report_app() -> FastAPI:
     load_dotenv()
-    client.api_key = os.getenv("OPENAI_API_KEY")
 
     app = FastAPI()
     app.add_middleware(
@@ -78,156 +255,39 @@ def create_report_app() -> FastAPI:
     )
 
     @app.post("/")
-    def generate_journal_docx(data: JournalRequest):
+    async def generate_journal_docx(data: JournalRequest):
         start = time.time()
-        # editedTranscript가 None/빈문자/공백일 때도 안전하게 처리
-        transcript = data.text
-        if data.editedTranscript and data.editedTranscript.strip() != "":
-            transcript = data.editedTranscript
-        # 1. 상담내용(요약)만 기존 프롬프트로 생성
-        summary_prompt = (
-            f"당신은 복지기관에서 사용하는 상담 보고서 요약을 작성하는 역할입니다.\n\n"
-            f"당신에게 제공된 상담 원문을 바탕으로 대상자인 **{transcript}**의 상태를 자연스럽고 정확하게 요약하세요.\n\n"
-            f"❗️다음 조건을 반드시 지켜주세요:\n"
-            f"- 문장은 '대상자님은 ~하고 계십니다'와 같이 3인칭 존칭 시점으로 작성하세요.\n"
-            f"- 첫 문장은 '네,', '안녕하세요' 등으로 시작하지 마세요. → ❌\n"
-            f"- '~입니다.', '~있습니다.', '~어려워하고 계십니다.'와 같이 자연스럽고 진단적인 톤을 사용하세요.\n"
-            f"- GPT형 멘트(예: 요약해 드리겠습니다)는 쓰지 마세요. → ❌\n"
-            f"- 한 문단으로 작성하며, 항목 구분이나 줄바꿈 없이 매끄럽게 연결된 문장으로 서술하세요."
-        )
-        summary_response = client.chat.completions.create(
-            model="gpt-4.1",
-            messages=[
-                {"role": "system", "content": summary_prompt},
-                {"role": "user", "content": transcript}
-            ]
-        )
-        summary = summary_response.choices[0].message.content
-
-        # 2. 나머지 항목은 한 번에 JSON으로 생성
-        meta_prompt = (
-            "아래 상담 대화 원문을 바탕으로 상담일지의 모든 항목(상담일자, 서비스, 담당자, 상담유형, 상담방법, 상담시간, 상담제목, 구분, 대상자, 연락처, 조치사항, 상담자의견, 상담결과, 비고)을 아래 JSON 형식으로 만들어줘. "
-            "상담내용(요약)은 이미 따로 생성했으니 제외해도 돼. "
-            "각 항목은 대화에 정보가 없더라도 상담의 흐름과 맥락을 바탕으로 반드시 추정해서 한 문장 이상으로 작성해줘. "
-            "특히 상담결과, 조치사항, 상담자의견, 비고 등은 빈 문자열로 두지 말고, 대화에서 유추해서라도 반드시 채워줘. "
-            "상담일자, 서비스, 담당자 등 명확히 알 수 없는 항목은 '정보 없음'으로 채워줘.\n"
-            "단, '연락처' 항목은 반드시 입력값 그대로 사용해줘.\n"
-            "{\n"
-            "  \"상담일자\": \"\",\n"
-            "  \"서비스\": \"\",\n"
-            "  \"담당자\": \"\",\n"
-            "  \"상담유형\": \"\",\n"
-            "  \"상담방법\": \"\",\n"
-            "  \"상담시간\": \"\",\n"
-            "  \"상담제목\": \"\",\n"
-            "  \"구분\": \"\",\n"
-            "  \"대상자\": \"\",\n"
-            "  \"연락처\": \"입력값 그대로\",\n"
-            "  \"조치사항\": \"\",\n"
-            "  \"상담자의견\": \"\",\n"
-            "  \"상담결과\": \"\",\n"
-            "  \"비고\": \"\"\n"
-            "}\n"
-            "상담 대화:\n" + transcript
-        )
-        meta_response = client.chat.completions.create(
-            model="gpt-4.1",
-            messages=[{"role": "system", "content": meta_prompt}]
-        )
-        meta_json = json.loads(meta_response.choices[0].message.content)
-
-        # 3. 상담내용(요약)만 summary로 대체
-        meta_json["상담내용"] = summary
-
-        # 4. 연락처를 입력값 그대로 덮어쓰기
-        meta_json["연락처"] = data.contact
-
-        # 4. 템플릿 렌더링
-        try:
-            tpl = DocxTemplate("상담일지양식.docx")
-            tpl.render(meta_json)
-        except Exception as e:
-            print("[템플릿 렌더링 에러]", str(e))
-            import traceback
-            traceback.print_exc()
-            raise HTTPException(status_code=500, detail=f"템플릿 렌더링 중 오류: {str(e)}")
-
-        # 5. 저장
-        filename = f"journal-{uuid.uuid4()}.docx"
-        filepath = f"./generated/{filename}"
-        os.makedirs("generated", exist_ok=True)
-        try:
-            tpl.save(filepath)
-        except Exception as e:
-            print("[파일 저장 에러]", str(e))
-            import traceback
-            traceback.print_exc()
-            raise HTTPException(status_code=500, detail=f"docx 파일 저장 중 오류: {str(e)}")
-
-        # 5-1. docx -> pdf 변환
-        pdf_filename = filename.replace('.docx', '.pdf')
-        pdf_filepath = filepath.replace('.docx', '.pdf')
-        try:
-            convert_docx_to_pdf(filepath, pdf_filepath)
-        except Exception as e:
-            import traceback
-            print(f"[PDF 변환 오류] {e}")
-            traceback.print_exc()
-            raise HTTPException(status_code=500, detail=f"PDF 변환 중 오류: {str(e)}")
-
-        BUCKET_NAME = 'oncare-backend'
-        s3 = boto3.client('s3')
-        docx_s3_key = f"journal/docx/{filename}"
-        pdf_s3_key = f"journal/pdf/{pdf_filename}"
-        try:
-            s3.upload_file(filepath, BUCKET_NAME, docx_s3_key)
-        except Exception as e:
-            print("[S3 업로드 중 에러 - DOCX]", str(e))
-            import traceback
-            traceback.print_exc()
-            raise HTTPException(status_code=500, detail=f"S3 DOCX 업로드 중 오류: {str(e)}")
-        try:
-            s3.upload_file(pdf_filepath, BUCKET_NAME, pdf_s3_key)
-        except Exception as e:
-            print("[S3 업로드 중 에러 - PDF]", str(e))
-            import traceback
-            traceback.print_exc()
-            raise HTTPException(status_code=500, detail=f"S3 PDF 업로드 중 오류: {str(e)}")
-        docx_url = f"https://{BUCKET_NAME}.s3.amazonaws.com/{docx_s3_key}"
-        pdf_url = f"https://{BUCKET_NAME}.s3.amazonaws.com/{pdf_s3_key}"
-
-        # 5-3. (선택) 로컬 파일 삭제
-        os.remove(filepath)
-        os.remove(pdf_filepath)
-
-        # 6. 응답
+        result = await build_journal(data)
         end = time.time()
         print(f"문서 생성 처리 시간: {end - start:.2f}초")
-        return {
-            "file": filename,
-            "docx_url": docx_url,
-            "pdf_url": pdf_url,
-            "summary": summary,
-            "recommendations": meta_json["조치사항"],
-            "opinion": meta_json["상담자의견"],
-            "result": meta_json["상담결과"],
-            "note": meta_json["비고"]
-        }
+        return result
+
+    @app.post("/jobs", status_code=202)
+    async def submit_journal_job(data: JournalRequest):
+        """문서 생성을 백그라운드 작업으로 등록하고 작업 ID를 즉시 반환 (GET /jobs/{id} 폴링 또는 callbackUrl 수신)"""
+        job = await job_manager.submit("journal", lambda job: build_journal(data, job), data.callbackUrl)
+        return {"jobId": job.id, "status": job.status}
+
+    @app.get("/jobs/{job_id}")
+    async def get_journal_job(job_id: str):
+        job = await job_manager.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+        return job
 
     @app.post("/convert-journal-pdf")
     def convert_journal_pdf(req: PdfConvertRequest):
         file_name = req.file_name
-        BUCKET_NAME = 'oncare-backend'
-        s3 = boto3.client('s3')
         docx_s3_key = f"journal/docx/{file_name}"
         pdf_file_name = file_name.replace('.docx', '.pdf')
-        pdf_s3_key = f"journal/pdf/{pdf_file_name}"
         try:
+            # lazy 모드로 생성된 문서(해시 메타데이터 있음)는 내용 주소 경로에 올려야 다운로드 시 재변환하지 않음
+            pdf_s3_key = lazy_pdfs.pdf_key("journal", file_name)
             with tempfile.TemporaryDirectory() as tmpdir:
                 docx_path = os.path.join(tmpdir, file_name)
                 pdf_path = os.path.join(tmpdir, pdf_file_name)
                 # 1. S3에서 docx 다운로드
-                s3.download_file(BUCKET_NAME, docx_s3_key, docx_path)
+                download_file(docx_s3_key, docx_path)
                 # 2. 변환 (OS별 분기)
                 try:
                     convert_docx_to_pdf(docx_path, pdf_path)
@@ -237,8 +297,8 @@ def create_report_app() -> FastAPI:
                     traceback.print_exc()
                     raise HTTPException(status_code=500, detail=f"PDF 변환 중 오류: {str(e)}")
                 # 3. S3 업로드
-                s3.upload_file(pdf_path, BUCKET_NAME, pdf_s3_key)
-                pdf_url = f"https://{BUCKET_NAME}.s3.amazonaws.com/{pdf_s3_key}"
+                pdf_url = upload_file(pdf_path, pdf_s3_key)
+                lazy_pdfs.mark_uploaded(pdf_s3_key)
             return {"pdf_url": pdf_url}
         except Exception as e:
             import traceback
@@ -246,28 +306,93 @@ def create_report_app() -> FastAPI:
             traceback.print_exc()
             raise HTTPException(status_code=500, detail=f"PDF 변환/업로드 중 오류: {str(e)}")
 
+    @app.post("/convert-journal-pdf-batch")
+    def convert_journal_pdf_batch(req: PdfBatchConvertRequest):
+        """여러 docx를 한 번에 pdf로 변환 (S3 동시 다운로드 → 묶음 변환 → 동시 업로드), 파일별 결과 반환"""
+        start = time.time()
+        file_names = list(dict.fromkeys(name.strip() for name in req.file_names if name.strip()))
+        results = {name: {"file_name": name} for name in file_names}
+
+        def fail(name, message):
+            results[name].update({"status": "error", "error": message})
+
+        with tempfile.TemporaryDirectory() as tmpdir, ThreadPoolExecutor(max_workers=PDF_BATCH_CONCURRENCY) as executor:
+            # 1. S3에서 docx 동시 다운로드 (같은 이름의 파일이 겹치지 않도록 순번을 붙임)
+            def download(index, name):
+                docx_path = os.path.join(tmpdir, f"{index}-{os.path.basename(name)}")
+                download_file(f"journal/docx/{name}", docx_path)
+                return docx_path
+
+            downloads = {name: executor.submit(download, i, name) for i, name in enumerate(file_names)}
+            converting = []
+            for name, future in downloads.items():
+                try:
+                    docx_path = future.result()
+                    converting.append((name, docx_path, os.path.splitext(docx_path)[0] + ".pdf"))
+                except Exception as e:
+                    fail(name, f"S3 다운로드 중 오류: {str(e)}")
+
+            # 2. 변환 (오피스 인스턴스별로 묶어서 실행)
+            errors = convert_docx_to_pdf_many([(docx_path, pdf_path) for _, docx_path, pdf_path in converting])
+
+            # 3. S3 동시 업로드
+            def upload(name, pdf_path):
+                pdf_s3_key = lazy_pdfs.pdf_key("journal", name)
+                pdf_url = upload_file(pdf_path, pdf_s3_key)
+                lazy_pdfs.mark_uploaded(pdf_s3_key)
+                return pdf_url
+
+            uploads = {}
+            for (name, _, pdf_path), error in zip(converting, errors):
+                if error is not None:
+                    fail(name, f"PDF 변환 중 오류: {str(error)}")
+                else:
+                    uploads[name] = executor.submit(upload, name, pdf_path)
+            for name, future in uploads.items():
+                try:
+                    results[name].update({"status": "ok", "pdf_url": future.result()})
+                except Exception as e:
+                    fail(name, f"S3 업로드 중 오류: {str(e)}")
+
+        succeeded = sum(1 for r in results.values() if r.get("status") == "ok")
+        print(f"PDF 일괄 변환 처리 시간: {time.time() - start:.2f}초 ({succeeded}/{len(file_names)})")
+        return {
+            "results": list(results.values()),
+            "succeeded": succeeded,
+            "failed": len(file_names) - succeeded,
+        }
+
+    @app.get("/llm-cache/stats")
+    def llm_cache_stats():
+        return llm_cache.stats()
+
+    @app.get("/pdf-converter/stats")
+    def pdf_converter_stats():
+        return office_pool.stats()
+
     @app.post("/download-docx-url")
     def get_docx_download_url(req: FileDownloadRequest):
-        BUCKET_NAME = 'oncare-backend'
-        s3 = boto3.client('s3')
-        docx_s3_key = f"journal/docx/{req.file_name}"
-        url = s3.generate_presigned_url(
-            ClientMethod='get_object',
-            Params={'Bucket': BUCKET_NAME, 'Key': docx_s3_key},
-            ExpiresIn=60 * 10  # 10분
-        )
-        return {"download_url": url}
+        return {"download_url": presigned_url(f"journal/docx/{req.file_name}")}
 
     @app.post("/download-pdf-url")
     def get_pdf_download_url(req: FileDownloadRequest):
-        BUCKET_NAME = 'oncare-backend'
-        s3 = boto3.client('s3')
-        pdf_s3_key = f"journal/pdf/{req.file_name}"
-        url = s3.generate_presigned_url(
-            ClientMethod='get_object',
-            Params={'Bucket': BUCKET_NAME, 'Key': pdf_s3_key},
-            ExpiresIn=60 * 10  # 10분
-        )
-        return {"download_url": url}
+        # lazy 모드로 생성된 문서는 첫 요청 시 변환 (같은 내용의 문서는 변환 결과 공유)
+        try:
+            pdf_s3_key = download_pdf_key("journal", req.file_name)
+        except Exception as e:
+            import traceback
+            print(f"[PDF 지연 생성 오류] {e}")
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=f"PDF 생성 중 오류: {str(e)}")
+        return {"download_url": presigned_url(pdf_s3_key)}
+
+    @app.post("/download-urls")
+    def get_download_urls(req: FileDownloadBatchRequest):
+        """여러 파일(.docx/.pdf)의 presigned URL을 한 번에 반환 (목록 화면용, 만료 직전까지 캐시된 URL 재사용)"""
+        return sign_file_names("journal", req.file_names, pdf_key=listing_pdf_key())
+
+    @app.get("/download-urls/stats")
+    def download_url_stats():
+        return {**presigned_urls.stats(), "lazy_pdf": lazy_pdfs.stats()}
 
     return app 
\ No newline at end of file
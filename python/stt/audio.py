@@ -0,0 +1,121 @@
+import os
+import ffmpeg
+import numpy as np
+
+# Whisper 입력 규격: 16kHz mono float32
+SAMPLE_RATE = 16000
+
+
+def decode_audio(content: bytes, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """업로드된 오디오(webm 등) 바이트를 ffmpeg 파이프로 디코딩해 float32 샘플 배열로 반환"""
+    try:
+        out, _ = (
+            ffmpeg
+            .input("pipe:0")
+            .output("pipe:1", format="f32le", acodec="pcm_f32le", ac=1, ar=sample_rate)
+            .run(input=content, capture_stdout=True, capture_stderr=True)
+        )
+    except ffmpeg.Error as e:
+        stderr = e.stderr.decode("utf-8", errors="ignore") if e.stderr else ""
+        raise Exception(f"ffmpeg 오디오 디코딩 실패: {stderr.strip()}")
+    return np.frombuffer(out, dtype=np.float32)
+
+
+def split_chunks(samples: np.ndarray, chunk_seconds: float, sample_rate: int = SAMPLE_RATE) -> list:
+    """샘플 배열을 chunk_seconds 단위로 분할 (복사 없이 view 반환)"""
+    chunk_size = int(chunk_seconds * sample_rate)
+    return [samples[i:i + chunk_size] for i in range(0, len(samples), chunk_size)]
+
+
+# 에너지 기반 VAD 설정
+VAD_FRAME_MS = 30
+VAD_MARGIN_DB = float(os.getenv("STT_VAD_MARGIN_DB", "10"))          # 잡음 바닥/최대 에너지 대비 여유 (dB)
+VAD_MIN_DB = float(os.getenv("STT_VAD_MIN_DB", "-50"))               # 이보다 작은 에너지는 항상 무음 (dBFS)
+VAD_MIN_SPEECH_MS = int(os.getenv("STT_VAD_MIN_SPEECH_MS", "250"))   # 이보다 짧은 발화는 잡음으로 간주
+VAD_MIN_SILENCE_MS = int(os.getenv("STT_VAD_MIN_SILENCE_MS", "300")) # 이보다 짧은 쉼은 발화로 이어붙임
+VAD_PAD_MS = int(os.getenv("STT_VAD_PAD_MS", "200"))                 # 발화 앞뒤 여유 구간
+MAX_SEGMENT_SECONDS = float(os.getenv("STT_MAX_SEGMENT_SECONDS", "30"))  # Whisper 입력 윈도우
+
+
+def _frame_db(samples: np.ndarray, frame: int) -> np.ndarray:
+    n = len(samples) // frame
+    frames = samples[:n * frame].reshape(n, frame)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    return 20 * np.log10(rms + 1e-10)
+
+
+def _true_runs(mask: np.ndarray) -> list:
+    """bool 배열에서 연속된 True 구간을 [(start, end), ...]로 반환"""
+    padded = np.concatenate([[False], mask, [False]])
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    return list(zip(edges[0::2], edges[1::2]))
+
+
+def detect_speech(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> list:
+    """발화 구간을 [(start_sample, end_sample), ...]로 반환 (무음/배경잡음 제거)"""
+    frame = int(sample_rate * VAD_FRAME_MS / 1000)
+    if len(samples) < frame:
+        return []
+    db = _frame_db(samples, frame)
+    # 잡음 바닥 기준 임계값. 전체가 발화인 녹음에서도 동작하도록 최대 에너지 기준으로 상한을 둠
+    threshold = max(min(np.percentile(db, 10) + VAD_MARGIN_DB, db.max() - VAD_MARGIN_DB), VAD_MIN_DB)
+    runs = _true_runs(db > threshold)
+
+    min_silence = VAD_MIN_SILENCE_MS // VAD_FRAME_MS
+    min_speech = VAD_MIN_SPEECH_MS // VAD_FRAME_MS
+    merged = []
+    for start, end in runs:
+        if merged and start - merged[-1][1] < min_silence:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    pad = int(sample_rate * VAD_PAD_MS / 1000)
+    segments = []
+    for start, end in merged:
+        if end - start < min_speech:
+            continue
+        start = max(0, int(start) * frame - pad)
+        end = min(len(samples), int(end) * frame + pad)
+        if segments and start <= segments[-1][1]:
+            segments[-1] = (segments[-1][0], end)
+        else:
+            segments.append((start, end))
+    return segments
+
+
+def has_speech(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> bool:
+    return bool(detect_speech(samples, sample_rate))
+
+
+def _split_long(samples: np.ndarray, start: int, end: int, max_len: int, sample_rate: int) -> list:
+    """max_len보다 긴 발화 구간을 윈도우 끝부분의 가장 조용한 프레임에서 자름"""
+    frame = int(sample_rate * VAD_FRAME_MS / 1000)
+    search = min(5 * sample_rate, max_len // 2)
+    pieces = []
+    while end - start > max_len:
+        window_end = start + max_len
+        db = _frame_db(samples[window_end - search:window_end], frame)
+        cut = window_end - search + int(np.argmin(db)) * frame if len(db) else window_end
+        pieces.append((start, cut))
+        start = cut
+    pieces.append((start, end))
+    return pieces
+
+
+def segment_speech(samples: np.ndarray, max_seconds: float = MAX_SEGMENT_SECONDS, sample_rate: int = SAMPLE_RATE) -> list:
+    """VAD로 무음을 제거하고, 쉼 지점에서 자른 발화들을 max_seconds 이하의 청크로 이어붙여 반환"""
+    max_len = int(max_seconds * sample_rate)
+    chunks = []
+    current = []
+    current_len = 0
+    for seg_start, seg_end in detect_speech(samples, sample_rate):
+        for start, end in _split_long(samples, seg_start, seg_end, max_len, sample_rate):
+            if current and current_len + (end - start) > max_len:
+                chunks.append(np.concatenate(current))
+                current, current_len = [], 0
+            current.append(samples[start:end])
+            current_len += end - start
+    if current:
+        chunks.append(np.concatenate(current))
+    return chunks
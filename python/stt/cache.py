@@ -0,0 +1,202 @@
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from starlette.concurrency import run_in_threadpool
+
+# 전사 결과 캐시 설정
+STT_CACHE_MAX_BYTES = int(os.getenv("STT_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))           # 메모리 LRU 최대 크기
+STT_CACHE_DIR = os.getenv("STT_CACHE_DIR", "")                                               # 디스크 캐시 경로 (빈 값이면 사용 안 함)
+STT_CACHE_DISK_MAX_BYTES = int(os.getenv("STT_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def cache_key(content: bytes, *parts: str) -> str:
+    """오디오 바이트 해시 + 모델/설정 식별자로 캐시 키 생성"""
+    digest = hashlib.sha256(content)
+    for part in parts:
+        digest.update(b"\0" + part.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    """전사 결과 캐시 (메모리 LRU + 선택적 디스크 계층, 크기 기준 제거)
+
+    같은 키의 요청이 동시에 들어오면 첫 요청만 계산하고 나머지는 그 결과를 기다린다.
+    디스크 계층의 파일 읽기/쓰기/정리는 get_or_compute에서 스레드풀로 실행되어 이벤트 루프를 막지 않는다.
+    """
+
+    def __init__(self, max_bytes: int = STT_CACHE_MAX_BYTES, cache_dir: str = STT_CACHE_DIR,
+                 disk_max_bytes: int = STT_CACHE_DISK_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._disk_bytes = None
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _memory_get(self, key: str):
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return text
+
+    def _disk_lookup(self, key: str):
+        """디스크 계층 조회 (있으면 메모리로 올림, 파일 I/O가 있으므로 비동기 코드에서는 스레드풀에서 호출)"""
+        text = self._disk_get(key)
+        with self._lock:
+            if text is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._memory_put(key, text)
+        return text
+
+    def get(self, key: str):
+        text = self._memory_get(key)
+        return text if text is not None else self._disk_lookup(key)
+
+    def put(self, key: str, text: str):
+        with self._lock:
+            self._memory_put(key, text)
+        self._disk_put(key, text)
+
+    async def get_or_compute(self, key: str, compute):
+        """캐시에 있으면 반환, 없으면 compute()를 한 번만 실행해 저장 후 반환"""
+        text = self._memory_get(key)
+        if text is None:
+            if self.cache_dir:
+                text = await run_in_threadpool(self._disk_lookup, key)
+                # 디스크를 읽는 동안 다른 요청이 계산을 마쳤을 수 있음
+                text = text if text is not None else self._entries.get(key)
+            else:
+                text = self._disk_lookup(key)
+        if text is not None:
+            return text
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            text = await compute()
+            with self._lock:
+                self._memory_put(key, text)
+            future.set_result(text)
+            if self.cache_dir:
+                await run_in_threadpool(self._disk_put, key, text)
+            return text
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 기다리는 요청이 없으면 "exception was never retrieved" 경고가 남지 않도록 소비
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def _memory_put(self, key: str, text: str):
+        size = len(text.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old.encode("utf-8"))
+        self._entries[key] = text
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.encode("utf-8"))
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".txt")
+
+    def _disk_get(self, key: str):
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            os.utime(path)  # LRU 순서 갱신
+            return text
+        except OSError:
+            return None
+
+    def _disk_put(self, key: str, text: str):
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            try:
+                old_size = os.path.getsize(path)  # 같은 키를 다시 쓰는 경우 기존 크기는 빼고 계산
+            except OSError:
+                old_size = 0
+            os.replace(tmp, path)
+            with self._lock:
+                if self._disk_bytes is not None:
+                    self._disk_bytes += os.path.getsize(path) - old_size
+            self._disk_evict()
+        except OSError:
+            pass
+
+    def _disk_files(self) -> list:
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith(".txt"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _disk_evict(self):
+        with self._lock:
+            if self._disk_bytes is not None and self._disk_bytes <= self.disk_max_bytes:
+                return
+            files = self._disk_files()
+            total = sum(size for _, size, _ in files)
+            # 오래 사용되지 않은 파일부터 최대 크기의 90%까지 삭제
+            if total > self.disk_max_bytes:
+                for _, size, path in sorted(files):
+                    if total <= self.disk_max_bytes * 0.9:
+                        break
+                    try:
+                        os.remove(path)
+                        total -= size
+                    except OSError:
+                        pass
+            self._disk_bytes = total
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "disk": bool(self.cache_dir),
+            "disk_bytes": self._disk_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "inflight": len(self._inflight),
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0,
+        }
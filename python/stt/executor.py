@@ -0,0 +1,37 @@
+import asyncio
+import contextvars
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+# Whisper 추론 풀 종류: thread(기본) | process
+STT_EXECUTOR = os.getenv("STT_EXECUTOR", "thread").lower()
+# 동시에 실행할 추론 작업 수 (CPU 바운드이므로 작게 유지)
+STT_WORKERS = int(os.getenv("STT_WORKERS", "1"))
+# ffmpeg 디코딩용 스레드 수
+STT_DECODE_WORKERS = int(os.getenv("STT_DECODE_WORKERS", "2"))
+
+
+def create_inference_executor(kind: str = STT_EXECUTOR, workers: int = STT_WORKERS):
+    workers = max(1, workers)
+    if kind == "process":
+        # torch 스레드 상태가 fork로 복제되지 않도록 spawn 사용 (자식 프로세스가 모델을 직접 로드)
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stt-infer")
+
+
+inference_executor = create_inference_executor()
+decode_executor = ThreadPoolExecutor(max_workers=max(1, STT_DECODE_WORKERS), thread_name_prefix="stt-decode")
+
+
+async def run_in_executor(executor, func, *args, **kwargs):
+    """블로킹 함수를 이벤트 루프 밖의 풀에서 실행
+
+    스레드 풀에서는 contextvars(요청 ID/span)를 복사해 실행한다. 프로세스 풀은 컨텍스트를 넘길 수 없으므로 그대로 실행.
+    """
+    loop = asyncio.get_running_loop()
+    call = partial(func, *args, **kwargs)
+    if not isinstance(executor, ProcessPoolExecutor):
+        call = partial(contextvars.copy_context().run, call)
+    return await loop.run_in_executor(executor, call)
@@ -0,0 +1,25 @@
+import os
+import resource
+
+SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def process_memory() -> dict:
+    """현재 프로세스의 메모리 사용량(MB)
+
+    Linux에서는 smaps_rollup으로 공유/전용 페이지를 구분해 보고한다.
+    워커 간 가중치 공유가 되고 있다면 Shared가 크고 Private이 작게 나타난다.
+    """
+    info = {"pid": os.getpid()}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in SMAPS_FIELDS:
+                    info[key.lower() + "_mb"] = round(int(value.split()[0]) / 1024, 1)
+        info["shared_mb"] = round(info.pop("shared_clean_mb", 0) + info.pop("shared_dirty_mb", 0), 1)
+        info["private_mb"] = round(info.pop("private_clean_mb", 0) + info.pop("private_dirty_mb", 0), 1)
+    except OSError:
+        # smaps_rollup이 없는 환경(macOS 등)은 최대 RSS만 보고
+        info["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return info
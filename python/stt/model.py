@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+import traceback
+import numpy as np
+from stt.audio import SAMPLE_RATE
+
+MODEL_ID = os.getenv("STT_MODEL_ID", "SungBeom/whisper-small-ko")
+# 양자화 모드: 빈 값(기본, fp32) | int8 (Linear 레이어 동적 int8 양자화, CPU 전용)
+STT_QUANTIZE = os.getenv("STT_QUANTIZE", "").lower()
+# 모델 로드 시점: background(기본, 기동 후 백그라운드 로드) | eager(기동 시 로드 완료까지 대기) | lazy(첫 요청 시 로드)
+STT_LOAD_MODE = os.getenv("STT_LOAD_MODE", "background").lower()
+# 추론에 사용할 CPU 스레드 수 (미지정 시 torch 기본값 = 물리 코어 수)
+STT_NUM_THREADS = int(os.getenv("STT_NUM_THREADS", "0"))
+
+
+# torch/transformers는 모델을 실제로 로드할 때만 import (리포트만 서빙하는 프로세스의 기동 시간 단축)
+
+def quantize_model(model, mode: str):
+    import torch
+
+    if not mode:
+        return model
+    if mode != "int8":
+        raise ValueError(f"지원하지 않는 STT_QUANTIZE 값입니다: {mode}")
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def build_pipeline(model_id: str = MODEL_ID, quantize: str = STT_QUANTIZE):
+    """Whisper 모델/프로세서를 로드해 ASR 파이프라인을 만든다 (CPU)"""
+    from transformers import pipeline, WhisperForConditionalGeneration, WhisperProcessor
+
+    model = WhisperForConditionalGeneration.from_pretrained(model_id)
+    processor = WhisperProcessor.from_pretrained(model_id)
+
+    # 최신 transformers가 아니더라도, config에 명시적으로 세팅
+    if not hasattr(model.generation_config, "no_timestamps_token_id"):
+        model.generation_config.no_timestamps_token_id = processor.tokenizer.convert_tokens_to_ids("<|notimestamps|>")
+
+    model.eval()
+    model = quantize_model(model, quantize)
+
+    return pipeline(
+        "automatic-speech-recognition",
+        model=model,
+        tokenizer=processor.tokenizer,
+        feature_extractor=processor.feature_extractor,
+        return_timestamps=False,
+        device=-1
+    )
+
+
+def run_pipeline(asr, chunks: list, batch_size: int) -> list:
+    """청크 배열들을 배치 단위로 파이프라인에 넣고, 입력 순서대로 텍스트 리스트를 반환"""
+    if not chunks:
+        return []
+    inputs = [{"raw": chunk, "sampling_rate": SAMPLE_RATE} for chunk in chunks]
+    results = asr(inputs, batch_size=max(1, min(batch_size, len(inputs))), return_timestamps=False)
+    return [result["text"].strip() for result in results]
+
+
+class ModelManager:
+    """Whisper 파이프라인의 로드/워밍업 상태를 관리 (not_loaded → loading → loaded → ready | failed)
+
+    gunicorn preload 모드에서는 master가 fork 이전에 가중치만 로드(loaded)하고,
+    각 워커가 기동 시 워밍업만 수행해서 ready가 된다. 가중치 메모리는 copy-on-write로 공유된다.
+    """
+
+    def __init__(self, model_id: str = MODEL_ID, quantize: str = STT_QUANTIZE, num_threads: int = STT_NUM_THREADS):
+        self.model_id = model_id
+        self.quantize = quantize
+        self.num_threads = num_threads
+        self.state = "not_loaded"
+        self.error = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.loaded_pid = None
+        self._pipe = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def get(self):
+        """파이프라인 반환 (아직 준비되지 않았다면 로드/워밍업 완료까지 대기)"""
+        if self.state != "ready":
+            self.load()
+        return self._pipe
+
+    def load(self, warmup: bool = True):
+        with self._lock:
+            try:
+                if self._pipe is None:
+                    self.state = "loading"
+                    self.error = None
+                    start = time.perf_counter()
+                    if self.num_threads > 0:
+                        import torch
+                        torch.set_num_threads(self.num_threads)
+                    self._pipe = build_pipeline(self.model_id, self.quantize)
+                    self.load_seconds = round(time.perf_counter() - start, 2)
+                    self.loaded_pid = os.getpid()
+                    self.state = "loaded"
+                    print(f"STT 모델 로드 완료: {self.load_seconds}초 (pid {self.loaded_pid})")
+                if warmup and self.state != "ready":
+                    self.warmup(self._pipe)
+                    self.state = "ready"
+                    print(f"STT 모델 워밍업 완료: {self.warmup_seconds}초 (pid {os.getpid()})")
+                return self._pipe
+            except Exception as e:
+                self.state = "failed"
+                self.error = str(e)
+                raise
+
+    def warmup(self, asr=None):
+        """더미 오디오로 한 번 추론해서 첫 실제 요청이 초기화 비용을 내지 않도록 함"""
+        asr = asr or self.get()
+        dummy = np.random.default_rng(0).normal(0, 0.01, SAMPLE_RATE).astype(np.float32)
+        start = time.perf_counter()
+        run_pipeline(asr, [dummy], 1)
+        self.warmup_seconds = round(time.perf_counter() - start, 2)
+
+    def start(self, mode: str = STT_LOAD_MODE):
+        """앱 기동 시 호출. mode에 따라 즉시/백그라운드/지연 로드"""
+        if self.state not in ("not_loaded", "loaded"):
+            return
+        if mode == "eager":
+            self.load()
+        elif mode == "background":
+            threading.Thread(target=self._load_quietly, name="stt-model-loader", daemon=True).start()
+
+    def _load_quietly(self):
+        try:
+            self.load()
+        except Exception:
+            traceback.print_exc()
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "model": self.model_id,
+            "quantize": self.quantize or "fp32",
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "error": self.error,
+            "pid": os.getpid(),
+            # 현재 pid와 다르면 fork 이전(master)에서 로드되어 공유 중인 가중치
+            "loaded_pid": self.loaded_pid,
+        }
@@ -0,0 +1,119 @@
+"""fp32 / int8 Whisper 정확도(CER)·속도(RTF) 비교 도구
+
+사용법 (python/ 디렉토리에서):
+    python -m stt.quantization_bench --samples samples/stt
+
+samples 디렉토리에는 오디오 파일(webm/wav/mp3/m4a)과 같은 이름의 정답 전사 .txt 파일을 둔다.
+    samples/stt/visit01.webm
+    samples/stt/visit01.txt
+"""
+import argparse
+import glob
+import json
+import os
+import time
+import torch
+from stt.audio import SAMPLE_RATE, decode_audio, segment_speech
+from stt.model import MODEL_ID, build_pipeline, run_pipeline
+
+AUDIO_EXTENSIONS = (".webm", ".wav", ".mp3", ".m4a", ".ogg")
+
+
+def char_error_rate(reference: str, hypothesis: str) -> float:
+    """공백을 제외한 글자 단위 편집 거리 / 정답 글자 수"""
+    ref = "".join(reference.split())
+    hyp = "".join(hypothesis.split())
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        cur = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r != h))
+        prev = cur
+    return prev[-1] / len(ref)
+
+
+def load_samples(samples_dir: str) -> list:
+    samples = []
+    for path in sorted(glob.glob(os.path.join(samples_dir, "*"))):
+        name, ext = os.path.splitext(path)
+        if ext.lower() not in AUDIO_EXTENSIONS or not os.path.exists(name + ".txt"):
+            continue
+        with open(path, "rb") as f:
+            audio = decode_audio(f.read())
+        with open(name + ".txt", encoding="utf-8") as f:
+            reference = f.read().strip()
+        samples.append({"name": os.path.basename(path), "audio": audio, "reference": reference})
+    return samples
+
+
+def evaluate(asr, samples: list, batch_size: int) -> dict:
+    # 첫 호출의 초기화 비용이 측정에 섞이지 않도록 워밍업
+    run_pipeline(asr, [samples[0]["audio"][:SAMPLE_RATE]], batch_size)
+    per_sample = []
+    total_audio = total_time = total_errors = total_chars = 0.0
+    for sample in samples:
+        chunks = segment_speech(sample["audio"])
+        start = time.perf_counter()
+        text = " ".join(run_pipeline(asr, chunks, batch_size)).strip()
+        elapsed = time.perf_counter() - start
+        duration = len(sample["audio"]) / SAMPLE_RATE
+        cer = char_error_rate(sample["reference"], text)
+        chars = len("".join(sample["reference"].split()))
+        per_sample.append({
+            "name": sample["name"],
+            "seconds": round(duration, 2),
+            "cer": round(cer, 4),
+            "rtf": round(elapsed / duration, 4) if duration else 0,
+            "text": text,
+        })
+        total_audio += duration
+        total_time += elapsed
+        total_errors += cer * chars
+        total_chars += chars
+    return {
+        "cer": round(total_errors / total_chars, 4) if total_chars else 0,
+        "rtf": round(total_time / total_audio, 4) if total_audio else 0,
+        "samples": per_sample,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Whisper fp32 / int8 양자화 비교")
+    parser.add_argument("--samples", default=os.path.join(os.path.dirname(__file__), "..", "samples", "stt"))
+    parser.add_argument("--model", default=MODEL_ID)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    if args.threads > 0:
+        torch.set_num_threads(args.threads)
+    samples = load_samples(args.samples)
+    if not samples:
+        raise SystemExit(f"비교할 샘플이 없습니다: {args.samples} (오디오 + 같은 이름의 .txt 필요)")
+
+    results = {}
+    for mode in ("", "int8"):
+        label = mode or "fp32"
+        print(f"[{label}] 모델 로드 중...")
+        asr = build_pipeline(args.model, quantize=mode)
+        results[label] = evaluate(asr, samples, args.batch_size)
+        print(f"[{label}] CER {results[label]['cer']:.4f} / RTF {results[label]['rtf']:.4f}")
+        del asr
+
+    fp32, int8 = results["fp32"], results["int8"]
+    print(f"{'mode':<6} {'CER':>8} {'RTF':>8}")
+    for label in ("fp32", "int8"):
+        print(f"{label:<6} {results[label]['cer']:>8.4f} {results[label]['rtf']:>8.4f}")
+    if int8["rtf"]:
+        print(f"speedup: x{fp32['rtf'] / int8['rtf']:.2f}, CER 변화: {int8['cer'] - fp32['cer']:+.4f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import asyncio
+import contextvars
+import time
+import traceback
+from common.metrics import record_stage, request_spans
+from stt.executor import run_in_executor
+
+
+class InferenceScheduler:
+    """여러 요청의 오디오 세그먼트를 큐에 모아 배치로 추론하는 마이크로 배칭 스케줄러
+
+    - 요청은 submit()으로 세그먼트를 큐에 넣고, 자기 세그먼트의 결과만 순서대로 돌려받는다.
+    - 워커는 max_batch_size개가 모이거나 max_wait_ms가 지나면 한 번에 infer_fn을 호출한다.
+    - infer_fn은 executor(스레드/프로세스 풀)에서 실행되므로 이벤트 루프를 막지 않는다.
+      동시에 실행되는 배치 수는 num_workers로 제한된다.
+    - 배치 추론 시간(inference_batch)은 배치에 세그먼트를 넣은 모든 요청의 span에 기록된다.
+    """
+
+    def __init__(self, infer_fn, executor=None, num_workers: int = 1, max_batch_size: int = 8,
+                 max_wait_ms: int = 20, max_queue_size: int = 256):
+        self.infer_fn = infer_fn
+        self.executor = executor
+        self.num_workers = max(1, num_workers)
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0, max_wait_ms)
+        self.max_queue_size = max_queue_size
+        self._queue = None
+        self._workers = []
+        self._running = 0
+        self._batches = 0
+        self._segments = 0
+        self._last_batch_size = 0
+
+    def _ensure_worker(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        loop = asyncio.get_running_loop()
+        while len(self._workers) < self.num_workers:
+            # 워커는 처음 submit한 요청의 컨텍스트(요청 ID/span)를 물려받지 않도록 빈 컨텍스트에서 실행
+            self._workers.append(contextvars.Context().run(loop.create_task, self._run()))
+
+    async def submit(self, segments: list) -> list:
+        """세그먼트 리스트를 큐에 넣고 모든 결과가 나올 때까지 대기 (입력 순서 유지)"""
+        if not segments:
+            return []
+        self._ensure_worker()
+        loop = asyncio.get_running_loop()
+        spans = request_spans()
+        futures = []
+        for segment in segments:
+            future = loop.create_future()
+            await self._queue.put((segment, future, spans))
+            futures.append(future)
+        return await asyncio.gather(*futures)
+
+    async def _next_batch(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            # 대기 중 취소된 요청(클라이언트 연결 종료 등)은 추론에서 제외
+            batch = [item for item in batch if not item[1].done()]
+            if not batch:
+                continue
+            self._running += 1
+            start = time.perf_counter()
+            try:
+                results = await self._infer([segment for segment, _, _ in batch])
+            except Exception as e:
+                traceback.print_exc()
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            finally:
+                self._running -= 1
+                requests = {id(spans): spans for _, _, spans in batch if spans is not None}
+                record_stage("inference_batch", time.perf_counter() - start, list(requests.values()))
+            self._batches += 1
+            self._segments += len(batch)
+            self._last_batch_size = len(batch)
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def _infer(self, segments: list) -> list:
+        return await run_in_executor(self.executor, self.infer_fn, segments, batch_size=self.max_batch_size)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "workers": self.num_workers,
+            "running_batches": self._running,
+            "max_queue_size": self.max_queue_size,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batches": self._batches,
+            "segments": self._segments,
+            "avg_batch_size": round(self._segments / self._batches, 2) if self._batches else 0,
+            "last_batch_size": self._last_batch_size,
+        }
@@ -1,33 +1,119 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+import json
+from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.responses import JSONResponse
-import tempfile
-import os
 import traceback
-from transformers import pipeline, WhisperForConditionalGeneration, WhisperProcessor
-from pydub import AudioSegment  # 추가
 import time  # 처리 시간 측정용
-import glob  # 파일 삭제용
-
-model_id = "SungBeom/whisper-small-ko"
-model = WhisperForConditionalGeneration.from_pretrained(model_id)
-processor = WhisperProcessor.from_pretrained(model_id)
-
-# 최신 transformers가 아니더라도, config에 명시적으로 세팅
-if not hasattr(model.generation_config, "no_timestamps_token_id"):
-    model.generation_config.no_timestamps_token_id = processor.tokenizer.convert_tokens_to_ids("<|notimestamps|>")
-
-pipe = pipeline(
-    "automatic-speech-recognition",
-    model=model,
-    tokenizer=processor.tokenizer,
-    feature_extractor=processor.feature_extractor,
-    return_timestamps=False,
-    device=-1
+import os
+from stt.audio import decode_audio, has_speech, segment_speech, split_chunks
+from stt.model import STT_LOAD_MODE, ModelManager, run_pipeline
+from stt.memory import process_memory
+from stt.cache import TranscriptCache, cache_key
+from stt.executor import STT_EXECUTOR, STT_WORKERS, decode_executor, inference_executor, run_in_executor
+from stt.scheduler import InferenceScheduler
+from stt.streaming import StreamingSession, create_stream_decoder
+from common.metrics import timed
+
+CHUNK_SECONDS = 20  # 20초 (fixed 모드)
+# 분할 방식: vad(기본, 무음 제거 후 쉼 지점에서 분할) | fixed(CHUNK_SECONDS 단위 고정 분할)
+STT_SEGMENTATION = os.getenv("STT_SEGMENTATION", "vad").lower()
+# 한 요청의 청크들을 묶어서 처리할 배치 크기
+STT_BATCH_SIZE = int(os.getenv("STT_BATCH_SIZE", "8"))
+
+# 모델은 import 시점이 아니라 앱 기동 후(STT_LOAD_MODE) 로드됨
+# STT_QUANTIZE=int8 이면 Linear 레이어를 동적 int8 양자화한 모델 사용
+model_manager = ModelManager()
+
+# STT_EXECUTOR=process이면 추론 프로세스(spawn)가 각자 모델을 로드하므로 이 프로세스에서는 로드하지 않고,
+# 워밍업 결과로 받은 추론 프로세스별 상태(pid → status)를 readiness에 사용
+pool_model_status = {}
+
+def warmup_model() -> dict:
+    """추론 풀 안에서 실행 (프로세스 풀로 보낼 수 있도록 모듈 함수): 모델 로드/워밍업 후 상태 반환"""
+    model_manager.warmup()
+    return model_manager.status()
+
+def _record_pool_status(future):
+    try:
+        status = future.result()
+        pool_model_status[status["pid"]] = status
+    except Exception:
+        traceback.print_exc()
+
+def start_stt_model():
+    if STT_EXECUTOR == "process":
+        if STT_LOAD_MODE != "lazy":
+            for _ in range(STT_WORKERS):
+                inference_executor.submit(warmup_model).add_done_callback(_record_pool_status)
+        return
+    model_manager.start()
+
+def model_status() -> dict:
+    if STT_EXECUTOR != "process":
+        return model_manager.status()
+    workers = list(pool_model_status.values())
+    state = "ready" if any(w["state"] == "ready" for w in workers) else ("loading" if STT_LOAD_MODE != "lazy" else "not_loaded")
+    return {"state": state, "executor": "process", "workers": workers}
+
+def segment_audio(samples) -> list:
+    if STT_SEGMENTATION == "fixed":
+        return split_chunks(samples, CHUNK_SECONDS)
+    return segment_speech(samples)
+
+def transcribe_chunks(chunks: list, batch_size: int = STT_BATCH_SIZE) -> list:
+    """청크 배열들을 배치 단위로 Whisper에 넣고, 입력 순서대로 텍스트 리스트를 반환"""
+    return run_pipeline(model_manager.get(), chunks, batch_size)
+
+# 동시 요청들의 청크를 모아서 배치 추론 (최대 배치 크기 / 최대 대기 시간 / 큐 크기)
+# 추론은 전용 풀(STT_EXECUTOR / STT_WORKERS)에서 실행되어 이벤트 루프가 다른 엔드포인트를 계속 처리함
+scheduler = InferenceScheduler(
+    transcribe_chunks,
+    executor=inference_executor,
+    num_workers=STT_WORKERS,
+    max_batch_size=STT_BATCH_SIZE,
+    max_wait_ms=int(os.getenv("STT_BATCH_WAIT_MS", "20")),
+    max_queue_size=int(os.getenv("STT_QUEUE_SIZE", "256")),
 )
 
+# 오디오 해시 + 모델 ID 기준 전사 결과 캐시
+transcript_cache = TranscriptCache()
+
+async def transcribe_content(content: bytes) -> str:
+    # 오디오를 메모리에서 바로 디코딩 (임시 파일 없이 ffmpeg 파이프 사용)
+    try:
+        with timed("audio_decode"):
+            samples = await run_in_executor(decode_executor, decode_audio, content)
+    except Exception as e:
+        traceback.print_exc()
+        raise Exception(f"오디오 디코딩 중 오류가 발생했습니다: {str(e)}")
+
+    if samples.size == 0:
+        raise Exception("유효한 오디오 데이터가 없습니다.")
+
+    # 발화 구간 단위로 분할하여 스케줄러를 통해 다른 요청과 함께 배치 처리
+    try:
+        with timed("chunking"):
+            chunks = segment_audio(samples)
+        # 스케줄러 대기 + 배치 추론 시간 (배치 추론 자체는 스케줄러가 inference_batch로 기록)
+        with timed("inference"):
+            transcripts = await scheduler.submit(chunks)
+        transcribed_text = " ".join(transcripts).strip()
+        if not transcribed_text:
+            raise Exception("음성 인식 결과가 비어있습니다.")
+        return transcribed_text
+    except Exception as e:
+        traceback.print_exc()
+        raise Exception(f"Whisper 처리 중 오류가 발생했습니다: {str(e)}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 단독 실행 시용 (메인 앱에 마운트된 경우 main.py의 lifespan에서 호출)
+    start_stt_model()
+    yield
+
 def create_stt_app() -> FastAPI:
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
 
     # CORS 설정
     app.add_middleware(
@@ -49,9 +135,92 @@ def create_stt_app() -> FastAPI:
             },
         )
 
+    @app.get("/health/live")
+    async def liveness():
+        return {"status": "ok"}
+
+    @app.get("/health/ready")
+    async def readiness():
+        status = model_status()
+        return JSONResponse(status_code=200 if status["state"] == "ready" else 503, content=status)
+
+    @app.post("/warmup")
+    async def warmup():
+        try:
+            status = await run_in_executor(inference_executor, warmup_model)
+        except Exception as e:
+            traceback.print_exc()
+            return JSONResponse(status_code=500, content={"error": str(e), **model_status()})
+        if STT_EXECUTOR == "process":
+            pool_model_status[status["pid"]] = status
+        return model_status()
+
+    @app.get("/stats/memory")
+    async def memory_stats():
+        # 워커별 RSS/PSS/공유 메모리 (gunicorn preload 시 가중치 공유 여부 확인용)
+        return {**process_memory(), "model": model_status()}
+
+    @app.get("/stats")
+    async def transcribe_stats():
+        return {**scheduler.stats(), "cache": transcript_cache.stats()}
+
+    @app.websocket("/stream")
+    async def transcribe_stream(websocket: WebSocket):
+        """연속 오디오 프레임(binary)을 받아 partial/final 결과를 실시간으로 전송
+
+        - query: format=webm(기본, ffmpeg 스트림 디코딩) | f32le | s16le (16kHz mono PCM)
+        - 종료: {"event": "stop"} 텍스트 메시지 → 남은 오디오 확정 후 {"type": "done"} 전송
+        """
+        await websocket.accept()
+
+        async def infer(segment):
+            # 무음/잡음뿐인 윈도우는 추론하지 않음
+            if STT_SEGMENTATION != "fixed" and not has_speech(segment):
+                return ""
+            return (await scheduler.submit([segment]))[0]
+
+        session = StreamingSession(infer, websocket.send_json)
+        decoder = create_stream_decoder(session.feed, websocket.query_params.get("format", "webm"))
+        disconnected = False
+        try:
+            await decoder.start()
+            session.start()
+            while True:
+                if session.done:
+                    # 세션 워커가 오류로 끝났으면(error 전송됨) 오디오를 더 쌓지 않고 연결 종료
+                    await websocket.close(code=1011)
+                    disconnected = True
+                    break
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    disconnected = True
+                    break
+                if message.get("bytes"):
+                    await decoder.feed(message["bytes"])
+                elif message.get("text"):
+                    event = json.loads(message["text"]).get("event")
+                    if event == "stop":
+                        break
+            if not disconnected:
+                await decoder.close()
+                await session.close()
+                await websocket.send_json({"type": "done", "text": session.text})
+                await websocket.close()
+        except WebSocketDisconnect:
+            pass
+        except Exception as e:
+            traceback.print_exc()
+            try:
+                await websocket.send_json({"type": "error", "text": str(e)})
+                await websocket.close(code=1011)
+            except Exception:
+                pass
+        finally:
+            await decoder.abort()
+            session.cancel()
+
     @app.post("/")
     async def transcribe_buffer(request: Request):
-        temp_file = None
         start_time = time.time()  # 처리 시간 측정 시작
         try:
             content = await request.body()
@@ -60,74 +229,18 @@ def create_stt_app() -> FastAPI:
             if content_size == 0:
                 raise Exception("빈 오디오 데이터를 받았습니다.")
 
-            # 임시 디렉토리 설정
-            try:
-                temp_dir = os.path.join(os.getcwd(), 'temp')
-                os.makedirs(temp_dir, exist_ok=True)
-            except Exception:
-                temp_dir = tempfile.gettempdir()
-
-            # 오디오 파일 저장
-            try:
-                temp_file = os.path.join(temp_dir, f'audio_{os.getpid()}_{id(content)}.webm')
-                with open(temp_file, 'wb') as f:
-                    f.write(content)
-                    f.flush()
-                    os.fsync(f.fileno())
-            except Exception as e:
-                traceback.print_exc()
-                raise Exception("오디오 데이터를 임시 파일로 저장하는 중 오류가 발생했습니다.")
-
-            if not os.path.exists(temp_file) or os.path.getsize(temp_file) == 0:
-                raise Exception("유효한 오디오 파일이 생성되지 않았습니다.")
-
-            # webm 오디오를 20초씩 분할하여 Whisper로 각각 처리
-            try:
-                audio = AudioSegment.from_file(temp_file, format="webm")
-                chunk_length_ms = 20 * 1000  # 20초
-                chunks = [audio[i:i+chunk_length_ms] for i in range(0, len(audio), chunk_length_ms)]
-                transcripts = []
-                for idx, chunk in enumerate(chunks):
-                    chunk_path = os.path.join(temp_dir, f"chunk_{os.getpid()}_{id(content)}_{idx}.wav")
-                    chunk.export(chunk_path, format="wav")
-                    result = pipe(chunk_path, return_timestamps=False)
-                    transcripts.append(result["text"].strip())
-                    os.remove(chunk_path)
-                transcribed_text = " ".join(transcripts).strip()
-                if not transcribed_text:
-                    raise Exception("음성 인식 결과가 비어있습니다.")
-                end_time = time.time()
-                print(f"STT 전체 처리 시간: {end_time - start_time:.2f}초")
-                return {"text": transcribed_text}
-            except Exception as e:
-                traceback.print_exc()
-                raise Exception(f"Whisper 처리 중 오류가 발생했습니다: {str(e)}")
+            # 같은 오디오(재시도/재전송)는 다시 디코딩하지 않고 캐시된 결과 사용
+            key = cache_key(content, model_manager.model_id, model_manager.quantize, STT_SEGMENTATION)
+            transcribed_text = await transcript_cache.get_or_compute(key, lambda: transcribe_content(content))
+            end_time = time.time()
+            print(f"STT 전체 처리 시간: {end_time - start_time:.2f}초")
+            return {"text": transcribed_text}
         except Exception as e:
             traceback.print_exc()
             return JSONResponse(
                 status_code=500,
                 content={"error": str(e)}
             )
-        finally:
-            # 임시 파일 삭제
-            try:
-                if temp_file and os.path.exists(temp_file):
-                    os.remove(temp_file)
-                temp_dir = os.path.dirname(temp_file) if temp_file else tempfile.gettempdir()
-                # chunk_*.wav 파일 모두 삭제
-                for chunk_file in glob.glob(os.path.join(temp_dir, "chunk_*.wav")):
-                    try:
-                        os.remove(chunk_file)
-                    except Exception:
-                        pass
-                # audio_*.webm 파일 모두 삭제
-                for webm_file in glob.glob(os.path.join(temp_dir, "audio_*.webm")):
-                    try:
-                        os.remove(webm_file)
-                    except Exception:
-                        pass
-            except Exception:
-                traceback.print_exc()
-    # ffmpeg가 시스템에 설치되어 있어야 webm → wav 변환이 정상 동작합니다.
+    # ffmpeg가 시스템에 설치되어 있어야 webm 디코딩이 정상 동작합니다.
 
     return app 
\ No newline at end of file
@@ -0,0 +1,225 @@
+import asyncio
+import os
+import traceback
+import numpy as np
+from stt.audio import SAMPLE_RATE
+
+# 스트리밍 STT 슬라이딩 윈도우 설정
+STREAM_WINDOW_SECONDS = float(os.getenv("STT_STREAM_WINDOW_SECONDS", "20"))   # 확정(final) 단위 윈도우 길이
+STREAM_STEP_SECONDS = float(os.getenv("STT_STREAM_STEP_SECONDS", "2"))        # 부분(partial) 결과 갱신 주기
+STREAM_OVERLAP_SECONDS = float(os.getenv("STT_STREAM_OVERLAP_SECONDS", "2"))  # 윈도우 간 겹치는 길이
+STREAM_MIN_SECONDS = 0.5  # 이보다 짧은 오디오는 추론하지 않음
+
+# 프레임으로 받을 수 있는 원시 PCM 포맷 (16kHz mono)
+PCM_DTYPES = {"f32le": np.float32, "s16le": np.int16}
+
+
+def merge_overlap(previous: str, current: str, max_words: int = 12) -> str:
+    """겹치는 윈도우로 인해 이전 텍스트 끝과 현재 텍스트 앞이 중복되면 중복 단어를 제거"""
+    prev_words = previous.split()
+    words = current.split()
+    for k in range(min(max_words, len(prev_words), len(words)), 0, -1):
+        if prev_words[-k:] == words[:k]:
+            return " ".join(words[k:])
+    return current
+
+
+class PcmStreamDecoder:
+    """원시 PCM 프레임(f32le / s16le)을 그대로 float32 샘플로 변환"""
+
+    def __init__(self, on_samples, input_format: str):
+        self.on_samples = on_samples
+        self.dtype = PCM_DTYPES[input_format]
+        self._remainder = b""
+
+    async def start(self):
+        pass
+
+    async def feed(self, data: bytes):
+        data = self._remainder + data
+        itemsize = np.dtype(self.dtype).itemsize
+        usable = len(data) - len(data) % itemsize
+        self._remainder = data[usable:]
+        samples = np.frombuffer(data[:usable], dtype=self.dtype)
+        if self.dtype == np.int16:
+            samples = samples.astype(np.float32) / 32768.0
+        if samples.size:
+            self.on_samples(samples)
+
+    async def close(self):
+        pass
+
+    async def abort(self):
+        pass
+
+
+class FfmpegStreamDecoder:
+    """세션마다 ffmpeg 프로세스 하나를 유지하며 컨테이너(webm 등) 프레임을 연속으로 디코딩"""
+
+    READ_SIZE = 4096 * 4
+
+    def __init__(self, on_samples, input_format: str = None):
+        self.on_samples = on_samples
+        self.input_format = input_format
+        self._proc = None
+        self._reader = None
+
+    async def start(self):
+        args = ["ffmpeg", "-loglevel", "error"]
+        if self.input_format:
+            args += ["-f", self.input_format]
+        args += ["-i", "pipe:0", "-f", "f32le", "-acodec", "pcm_f32le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1"]
+        self._proc = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self):
+        remainder = b""
+        while True:
+            data = await self._proc.stdout.read(self.READ_SIZE)
+            if not data:
+                break
+            data = remainder + data
+            usable = len(data) - len(data) % 4
+            remainder = data[usable:]
+            if usable:
+                self.on_samples(np.frombuffer(data[:usable], dtype=np.float32))
+
+    async def feed(self, data: bytes):
+        self._proc.stdin.write(data)
+        await self._proc.stdin.drain()
+
+    async def close(self):
+        """입력을 닫고 ffmpeg가 남은 샘플을 모두 내보낼 때까지 대기"""
+        if self._proc is None:
+            return
+        if not self._proc.stdin.is_closing():
+            self._proc.stdin.close()
+        await self._reader
+        await self._proc.wait()
+
+    async def abort(self):
+        if self._proc is not None and self._proc.returncode is None:
+            self._proc.kill()
+            await self._proc.wait()
+        if self._reader is not None and not self._reader.done():
+            self._reader.cancel()
+
+
+def create_stream_decoder(on_samples, input_format: str = "webm"):
+    if input_format in PCM_DTYPES:
+        return PcmStreamDecoder(on_samples, input_format)
+    return FfmpegStreamDecoder(on_samples, input_format)
+
+
+class StreamingSession:
+    """WebSocket 세션 하나의 디코딩/추론 상태
+
+    - 현재 윈도우(확정되지 않은 오디오)에 대해 step마다 partial 결과를 보낸다.
+    - 윈도우가 가득 차면 final 결과를 보내고, overlap만 남긴 채 다음 윈도우로 넘어간다.
+    """
+
+    def __init__(self, infer, send, window_seconds: float = STREAM_WINDOW_SECONDS,
+                 step_seconds: float = STREAM_STEP_SECONDS, overlap_seconds: float = STREAM_OVERLAP_SECONDS):
+        self.infer = infer
+        self.send = send
+        self.window = int(window_seconds * SAMPLE_RATE)
+        self.step = int(step_seconds * SAMPLE_RATE)
+        self.overlap = min(int(overlap_seconds * SAMPLE_RATE), self.window // 2)
+        self.min_samples = int(STREAM_MIN_SECONDS * SAMPLE_RATE)
+        self._chunks = []
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._offset = 0              # 현재 윈도우 시작 위치 (세션 기준 샘플 인덱스)
+        self._last_partial_end = 0
+        self._finalized_end = 0       # final 결과로 확정된 마지막 샘플 위치
+        self._finals = []
+        self._wake = asyncio.Event()
+        self._closed = False
+        self._task = None
+
+    @property
+    def text(self) -> str:
+        return " ".join(t for t in self._finals if t).strip()
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    @property
+    def done(self) -> bool:
+        """세션 워커 종료 여부 (오류로 끝났으면 더 이상 오디오를 처리하지 않음)"""
+        return self._task is not None and self._task.done()
+
+    def feed(self, samples: np.ndarray):
+        if self.done:
+            return
+        self._chunks.append(samples)
+        self._wake.set()
+
+    async def close(self):
+        """남은 오디오를 확정 처리하고 세션 워커 종료까지 대기"""
+        self._closed = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    async def _emit(self, kind: str, text: str, start: int, end: int):
+        try:
+            await self.send({
+                "type": kind,
+                "text": text,
+                "start": round(start / SAMPLE_RATE, 2),
+                "end": round(end / SAMPLE_RATE, 2),
+            })
+        except Exception:
+            # 클라이언트 연결이 끊겨도 세션은 마무리
+            pass
+
+    def _drain(self):
+        if self._chunks:
+            self._buffer = np.concatenate([self._buffer, *self._chunks])
+            self._chunks = []
+
+    async def _finalize(self, segment: np.ndarray):
+        text = merge_overlap(self.text, (await self.infer(segment)).strip())
+        self._finals.append(text)
+        self._finalized_end = self._offset + len(segment)
+        await self._emit("final", text, self._offset, self._finalized_end)
+
+    async def _run(self):
+        try:
+            while True:
+                await self._wake.wait()
+                self._wake.clear()
+                closed = self._closed
+                self._drain()
+
+                # 가득 찬 윈도우는 확정하고 overlap만 남김
+                while len(self._buffer) >= self.window:
+                    await self._finalize(self._buffer[:self.window])
+                    advance = self.window - self.overlap
+                    self._buffer = self._buffer[advance:]
+                    self._offset += advance
+                    self._last_partial_end = self._finalized_end
+
+                end = self._offset + len(self._buffer)
+                if closed:
+                    if end - self._finalized_end >= self.min_samples:
+                        await self._finalize(self._buffer)
+                    return
+                if end - self._last_partial_end >= self.step and len(self._buffer) >= self.min_samples:
+                    text = merge_overlap(self.text, (await self.infer(self._buffer)).strip())
+                    self._last_partial_end = end
+                    await self._emit("partial", text, self._offset, end)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            traceback.print_exc()
+            await self._emit("error", str(e), self._offset, self._offset + len(self._buffer))
@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+import common.jobs as jobs
+from common.jobs import JobManager, MemoryJobStore
+
+
+def test_stage_slot_is_released_before_the_callback(monkeypatch):
+    manager = JobManager(MemoryJobStore(), {"pdf": 1})
+    notified = []
+
+    async def slow_notify(job):
+        await asyncio.sleep(0.3)
+        notified.append(job.id)
+
+    monkeypatch.setattr(manager, "_notify", slow_notify)
+
+    async def main():
+        job = jobs.Job("journal", "http://callback.invalid/")
+
+        async def job_stage():
+            async with manager.stage(job, "pdf"):
+                await asyncio.sleep(0.01)
+
+        async def other_request():
+            await asyncio.sleep(0.02)
+            start = time.monotonic()
+            async with manager.stage(None, "pdf"):
+                return time.monotonic() - start
+
+        _, waited = await asyncio.gather(job_stage(), other_request())
+        return job, waited
+
+    job, waited = asyncio.run(main())
+    assert waited < 0.1
+    assert notified == [job.id]
+    assert job.stages[0]["finished_at"] is not None
+
+
+def test_submitted_job_records_stages_and_result():
+    manager = JobManager(MemoryJobStore(), {"llm": 2})
+
+    async def pipeline(job):
+        async with manager.stage(job, "llm"):
+            pass
+        return {"ok": True}
+
+    async def main():
+        job = await manager.submit("journal", pipeline)
+        await asyncio.gather(*manager._tasks)
+        return await manager.get(job.id)
+
+    saved = asyncio.run(main())
+    assert saved["status"] == "succeeded"
+    assert saved["result"] == {"ok": True}
+    assert [stage["name"] for stage in saved["stages"]] == ["llm"]
+
+
+def test_sqlite_store_calls_run_off_the_event_loop(tmp_path):
+    import threading
+
+    store = jobs.SqliteJobStore(str(tmp_path / "jobs.sqlite3"))
+    threads = []
+    save = store.save
+    store.save = lambda job: (threads.append(threading.get_ident()), save(job))[1]
+    manager = JobManager(store, {"render": 1})
+
+    async def pipeline(job):
+        async with manager.stage(job, "render"):
+            pass
+        return {}
+
+    async def main():
+        job = await manager.submit("weekly_report", pipeline)
+        await asyncio.gather(*manager._tasks)
+        return threading.get_ident(), await manager.get(job.id)
+
+    loop_thread, saved = asyncio.run(main())
+    assert saved["status"] == "succeeded"
+    assert threads and loop_thread not in threads
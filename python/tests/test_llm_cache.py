@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+import pytest
+
+from common.llm_cache import LLMCache, MemoryBackend, SqliteBackend, cache_key
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend(max_entries=2)
+    return SqliteBackend(str(tmp_path / "llm_cache.sqlite3"), max_entries=2)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_cache_key_normalizes_whitespace_and_includes_version():
+    messages = [{"role": "user", "content": "  안녕하세요\n\n 어르신  "}]
+    same = [{"role": "user", "content": "안녕하세요 어르신"}]
+    assert cache_key("gpt-4.1", "v1", messages) == cache_key("gpt-4.1", "v1", same)
+    assert cache_key("gpt-4.1", "v1", messages) != cache_key("gpt-4.1", "v2", messages)
+    assert cache_key("gpt-4.1", "v1", messages) != cache_key("gpt-4o", "v1", messages)
+
+
+def test_get_returns_stored_value_and_counts_hits(backend):
+    cache = LLMCache(backend, ttl=60)
+
+    async def main():
+        assert await cache.get("k") is None
+        await cache.set("k", "응답")
+        return await cache.get("k")
+
+    assert run(main()) == "응답"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_expired_entries_are_not_returned(backend):
+    cache = LLMCache(backend, ttl=60)
+
+    async def main():
+        backend.set("old", "값", time.time() - 1)
+        return await cache.get("old")
+
+    assert run(main()) is None
+
+
+def test_least_recently_used_entry_is_evicted(backend):
+    cache = LLMCache(backend, ttl=60)
+
+    async def main():
+        await cache.set("a", "1")
+        await asyncio.sleep(0.01)
+        await cache.set("b", "2")
+        await asyncio.sleep(0.01)
+        assert await cache.get("a") == "1"   # a가 최근 사용됨
+        await asyncio.sleep(0.01)
+        await cache.set("c", "3")
+        return [await cache.get(key) for key in ("a", "b", "c")]
+
+    assert run(main()) == ["1", None, "3"]
+    assert backend.size() == 2
+
+
+def test_sqlite_reads_do_not_write(tmp_path):
+    backend = SqliteBackend(str(tmp_path / "llm_cache.sqlite3"), max_entries=10)
+    backend.set("k", "v", time.time() + 60)
+    conn = backend._connection()
+    before = conn.total_changes
+    assert backend.get("k") == "v"
+    assert conn.total_changes == before
+
+
+def test_sqlite_entries_are_shared_between_instances(tmp_path):
+    path = str(tmp_path / "llm_cache.sqlite3")
+    SqliteBackend(path, max_entries=10).set("k", "v", time.time() + 60)
+    assert SqliteBackend(path, max_entries=10).get("k") == "v"
+
+
+def test_no_backend_disables_the_cache():
+    cache = LLMCache(None)
+
+    async def main():
+        await cache.set("k", "v")
+        return await cache.get("k")
+
+    assert run(main()) is None
+    assert cache.stats()["entries"] == 0
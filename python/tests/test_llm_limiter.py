@@ -0,0 +1,121 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+import common.llm as llm
+from common.llm import AdaptiveLimiter, retry_delay
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def rate_limit_error(retry_after: str = None) -> openai.RateLimitError:
+    headers = {"retry-after": retry_after} if retry_after is not None else {}
+    response = httpx.Response(429, headers=headers, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+    return openai.RateLimitError("Rate limit reached", response=response, body=None)
+
+
+def fake_client(create):
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    client.with_options = lambda **kwargs: client
+    return client
+
+
+def test_429_halves_the_limit_and_pauses_new_calls():
+    limiter = AdaptiveLimiter(max_limit=8)
+
+    async def main():
+        await limiter.acquire()
+        await limiter.release(rate_limited=True, delay=0.1)
+        assert limiter.limit == 4
+        start = time.monotonic()
+        await limiter.acquire()
+        waited = time.monotonic() - start
+        await limiter.release()
+        return waited
+
+    assert run(main()) >= 0.09
+    assert limiter.rate_limited == 1
+
+
+def test_limit_never_drops_below_min_and_recovers_after_successes():
+    limiter = AdaptiveLimiter(max_limit=4, min_limit=1)
+
+    async def main():
+        for _ in range(5):
+            await limiter.acquire()
+            await limiter.release(rate_limited=True)
+        assert limiter.limit == 1
+        # 현재 한도만큼 성공이 이어질 때마다 1씩 회복 (1 → 2 → 3 → 4)
+        for _ in range(1 + 2 + 3):
+            await limiter.acquire()
+            await limiter.release()
+
+    run(main())
+    assert limiter.limit == 4
+
+
+def test_acquire_blocks_above_the_limit():
+    limiter = AdaptiveLimiter(max_limit=2)
+    peak = []
+
+    async def call():
+        await limiter.acquire()
+        peak.append(limiter.active)
+        await asyncio.sleep(0.01)
+        await limiter.release()
+
+    async def main():
+        await asyncio.gather(*[call() for _ in range(6)])
+
+    run(main())
+    assert max(peak) == 2
+    assert limiter.active == 0
+
+
+def test_retry_delay_uses_retry_after_header():
+    assert retry_delay(rate_limit_error("3"), attempt=0) == 3.0
+    delay = retry_delay(rate_limit_error(), attempt=2)
+    assert 0 < delay <= llm.LLM_BACKOFF_BASE * 4
+
+
+def test_create_completion_retries_429_and_lowers_the_limit(monkeypatch):
+    limiter = AdaptiveLimiter(max_limit=8)
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        if len(calls) <= 2:
+            raise rate_limit_error("0")
+        return SimpleNamespace(choices=[], usage=SimpleNamespace(prompt_tokens=3, completion_tokens=2))
+
+    monkeypatch.setattr(llm, "llm_limiter", limiter)
+    monkeypatch.setattr(llm, "get_async_client", lambda: fake_client(create))
+
+    response = run(llm.create_completion("gpt-4.1", [{"role": "user", "content": "hi"}], timeout=5))
+    assert response.usage.prompt_tokens == 3
+    assert len(calls) == 3
+    assert limiter.rate_limited == 2
+    assert limiter.limit == 2
+    assert limiter.active == 0
+
+
+def test_create_completion_gives_up_after_rate_limit_retries(monkeypatch):
+    limiter = AdaptiveLimiter(max_limit=4)
+
+    async def create(**kwargs):
+        raise rate_limit_error("0")
+
+    monkeypatch.setattr(llm, "llm_limiter", limiter)
+    monkeypatch.setattr(llm, "get_async_client", lambda: fake_client(create))
+    monkeypatch.setattr(llm, "LLM_RATE_LIMIT_RETRIES", 1)
+
+    with pytest.raises(openai.RateLimitError):
+        run(llm.create_completion("gpt-4.1", [{"role": "user", "content": "hi"}], timeout=5))
+    assert limiter.rate_limited == 2
+    assert limiter.active == 0
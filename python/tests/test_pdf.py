@@ -0,0 +1,75 @@
+import platform
+
+import pytest
+
+import common.pdf as pdf
+from common.metrics import stage_seconds
+
+
+class FakePool:
+    """LibreOffice 없이 변환 경로를 확인하기 위한 풀 (docx 내용을 그대로 pdf로 복사)"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls = []
+
+    def convert(self, docx_path, pdf_path, timeout=None):
+        self.calls.append((docx_path, pdf_path))
+        if self.fail:
+            raise Exception("office crashed")
+        with open(docx_path, "rb") as src, open(pdf_path, "wb") as dst:
+            dst.write(b"%PDF " + src.read())
+        return pdf_path
+
+    def convert_many(self, pairs, timeout=None):
+        errors = []
+        for docx_path, pdf_path in pairs:
+            try:
+                self.convert(docx_path, pdf_path)
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+        return errors
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    fake = FakePool()
+    monkeypatch.setattr(pdf, "office_pool", fake)
+    monkeypatch.setattr(platform, "system", lambda: "Linux")
+    return fake
+
+
+def stage_count(stage: str) -> int:
+    entry = stage_seconds._values.get((("stage", stage),))
+    return entry[2] if entry else 0
+
+
+def test_convert_many_with_no_files_returns_empty(pool):
+    before = stage_count("pdf_convert_batch")
+    assert pdf.convert_docx_to_pdf_many([]) == []
+    assert stage_count("pdf_convert_batch") == before + 1
+
+
+def test_convert_many_reports_errors_per_file(pool, tmp_path):
+    good = tmp_path / "a.docx"
+    good.write_bytes(b"docx")
+    missing = tmp_path / "missing.docx"
+    errors = pdf.convert_docx_to_pdf_many([(str(good), str(tmp_path / "a.pdf")), (str(missing), str(tmp_path / "b.pdf"))])
+    assert errors[0] is None
+    assert "LibreOffice PDF 변환 실패" in str(errors[1])
+    assert (tmp_path / "a.pdf").read_bytes() == b"%PDF docx"
+
+
+def test_convert_docx_bytes_to_pdf_round_trip(pool):
+    before = stage_count("pdf_convert")
+    assert pdf.convert_docx_bytes_to_pdf(b"content", "journal") == b"%PDF content"
+    assert len(pool.calls) == 1
+    assert stage_count("pdf_convert") == before + 1
+
+
+def test_convert_failure_is_wrapped(monkeypatch):
+    monkeypatch.setattr(pdf, "office_pool", FakePool(fail=True))
+    monkeypatch.setattr(platform, "system", lambda: "Linux")
+    with pytest.raises(Exception, match="LibreOffice PDF 변환 실패"):
+        pdf.convert_docx_bytes_to_pdf(b"content")
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from stt.scheduler import InferenceScheduler
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_results_follow_each_request_input_order():
+    batches = []
+
+    def infer(segments, batch_size):
+        batches.append(list(segments))
+        return [f"text-{segment}" for segment in segments]
+
+    scheduler = InferenceScheduler(infer, executor=ThreadPoolExecutor(1), max_batch_size=4, max_wait_ms=20)
+
+    async def main():
+        return await asyncio.gather(
+            scheduler.submit([1, 2, 3]),
+            scheduler.submit([10, 20]),
+            scheduler.submit([]),
+        )
+
+    first, second, empty = run(main())
+    assert first == ["text-1", "text-2", "text-3"]
+    assert second == ["text-10", "text-20"]
+    assert empty == []
+    # 두 요청의 세그먼트가 최대 배치 크기 단위로 섞여서 처리됨
+    assert all(len(batch) <= 4 for batch in batches)
+    assert sorted(s for batch in batches for s in batch) == [1, 2, 3, 10, 20]
+    assert scheduler.stats()["segments"] == 5
+
+
+def test_batch_error_is_raised_to_every_waiting_request():
+    def infer(segments, batch_size):
+        raise RuntimeError("inference failed")
+
+    scheduler = InferenceScheduler(infer, executor=ThreadPoolExecutor(1), max_batch_size=8, max_wait_ms=20)
+
+    async def main():
+        return await asyncio.gather(scheduler.submit([1]), scheduler.submit([2]), return_exceptions=True)
+
+    results = run(main())
+    assert [str(r) for r in results] == ["inference failed", "inference failed"]
+
+
+def test_scheduler_keeps_working_after_a_failed_batch():
+    calls = []
+
+    def infer(segments, batch_size):
+        calls.append(list(segments))
+        if len(calls) == 1:
+            raise RuntimeError("first batch fails")
+        return [segment * 2 for segment in segments]
+
+    scheduler = InferenceScheduler(infer, executor=ThreadPoolExecutor(1), max_wait_ms=0)
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await scheduler.submit([1])
+        return await scheduler.submit([3])
+
+    assert run(main()) == [6]
+
+
+def test_batches_wait_for_the_executor_limit():
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def infer(segments, batch_size):
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        threading.Event().wait(0.02)
+        with lock:
+            running.pop()
+        return segments
+
+    scheduler = InferenceScheduler(infer, executor=ThreadPoolExecutor(2), num_workers=2, max_batch_size=1, max_wait_ms=0)
+
+    async def main():
+        return await asyncio.gather(*[scheduler.submit([i]) for i in range(6)])
+
+    assert run(main()) == [[i] for i in range(6)]
+    assert max(peak) <= 2
@@ -0,0 +1,29 @@
+from common.llm import estimate_tokens, split_by_tokens
+
+
+def test_short_text_stays_in_one_segment():
+    assert split_by_tokens("안녕하세요. 오늘은 괜찮으세요?", 100) == ["안녕하세요. 오늘은 괜찮으세요?"]
+
+
+def test_segments_break_at_sentence_boundaries_within_the_limit():
+    sentences = [f"{i}번째 문장입니다." for i in range(30)]
+    text = " ".join(sentences)
+    segments = split_by_tokens(text, 40)
+    assert len(segments) > 1
+    assert all(estimate_tokens(segment) <= 40 for segment in segments)
+    # 문장이 중간에 잘리지 않고 순서대로 모두 포함됨
+    assert " ".join(segments) == text
+    assert all(segment.endswith(".") for segment in segments)
+
+
+def test_a_single_overlong_sentence_is_cut_by_characters():
+    sentence = "가" * 250
+    segments = split_by_tokens(sentence, 100)
+    assert len(segments) >= 3
+    assert all(estimate_tokens(segment) <= 100 for segment in segments)
+    assert "".join(segments) == sentence
+
+
+def test_empty_text_has_no_segments():
+    assert split_by_tokens("", 100) == []
+    assert split_by_tokens("   \n ", 100) == []
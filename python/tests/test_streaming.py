@@ -0,0 +1,22 @@
+from stt.streaming import merge_overlap
+
+
+def test_merge_overlap_removes_words_repeated_from_the_previous_window():
+    assert merge_overlap("어제 병원에 다녀 오셨어요", "다녀 오셨어요 오늘은 괜찮으세요") == "오늘은 괜찮으세요"
+
+
+def test_merge_overlap_prefers_the_longest_overlap():
+    assert merge_overlap("a b a b", "a b a b c") == "c"
+
+
+def test_merge_overlap_keeps_text_without_overlap():
+    assert merge_overlap("식사는 하셨어요", "네 두 끼 드셨어요") == "네 두 끼 드셨어요"
+    assert merge_overlap("", "처음 문장") == "처음 문장"
+
+
+def test_merge_overlap_only_looks_at_max_words():
+    previous = " ".join(str(i) for i in range(20))
+    current = " ".join(str(i) for i in range(5, 20)) + " 끝"
+    # 15단어가 겹치지만 max_words=12까지만 비교하므로 제거되지 않음
+    assert merge_overlap(previous, current, max_words=12) == current
+    assert merge_overlap(previous, current, max_words=15) == "끝"
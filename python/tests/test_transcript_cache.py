@@ -0,0 +1,97 @@
+import asyncio
+import os
+
+import pytest
+
+from stt.cache import TranscriptCache, cache_key
+
+
+def test_cache_key_depends_on_audio_and_settings():
+    assert cache_key(b"audio", "model", "vad") == cache_key(b"audio", "model", "vad")
+    assert cache_key(b"audio", "model", "vad") != cache_key(b"audio", "model", "fixed")
+    assert cache_key(b"audio", "model") != cache_key(b"other", "model")
+
+
+def test_memory_tier_evicts_least_recently_used_by_size():
+    cache = TranscriptCache(max_bytes=10, cache_dir="")
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    assert cache.get("a") == "aaaa"   # a가 최근 사용됨
+    cache.put("c", "cccc")            # 12바이트 > 10 → b 제거
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+    assert cache.get("c") == "cccc"
+    assert cache.stats()["bytes"] == 8
+
+
+def test_values_larger_than_the_memory_tier_are_not_kept():
+    cache = TranscriptCache(max_bytes=4, cache_dir="")
+    cache.put("a", "too long")
+    assert cache.get("a") is None
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    TranscriptCache(max_bytes=1024, cache_dir=str(tmp_path)).put("key", "전사 결과")
+    cache = TranscriptCache(max_bytes=1024, cache_dir=str(tmp_path))
+    assert cache.get("key") == "전사 결과"
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_disk_tier_evicts_oldest_files(tmp_path):
+    cache = TranscriptCache(max_bytes=0, cache_dir=str(tmp_path), disk_max_bytes=25)
+    for i, key in enumerate(["k1", "k2", "k3"]):
+        cache.put(key, "x" * 10)
+        path = cache._disk_path(key)
+        os.utime(path, (1000 + i, 1000 + i))
+    cache.put("k4", "x" * 10)
+    assert not os.path.exists(cache._disk_path("k1"))
+    assert os.path.exists(cache._disk_path("k4"))
+    assert cache.stats()["disk_bytes"] <= 25
+
+
+def test_rewriting_a_key_does_not_double_count_disk_bytes(tmp_path):
+    cache = TranscriptCache(max_bytes=0, cache_dir=str(tmp_path), disk_max_bytes=10 ** 6)
+    cache._disk_bytes = 0
+    cache.put("k", "x" * 10)
+    cache.put("k", "x" * 10)
+    assert cache.stats()["disk_bytes"] == 10
+
+
+def test_concurrent_requests_share_one_computation(tmp_path):
+    cache = TranscriptCache(max_bytes=1024, cache_dir=str(tmp_path))
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "결과"
+
+    async def main():
+        results = await asyncio.gather(*[cache.get_or_compute("k", compute) for _ in range(5)])
+        again = await cache.get_or_compute("k", compute)
+        return results, again
+
+    results, again = asyncio.run(main())
+    assert results == ["결과"] * 5
+    assert again == "결과"
+    assert len(calls) == 1
+    assert os.path.exists(cache._disk_path("k"))
+
+
+def test_failed_computation_is_not_cached():
+    cache = TranscriptCache(max_bytes=1024, cache_dir="")
+    attempts = []
+
+    async def compute():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("decode failed")
+        return "ok"
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await cache.get_or_compute("k", compute)
+        return await cache.get_or_compute("k", compute)
+
+    assert asyncio.run(main()) == "ok"
+    assert len(attempts) == 2
@@ -0,0 +1,64 @@
+import numpy as np
+
+from stt.audio import SAMPLE_RATE, detect_speech, segment_speech
+
+
+def tone(seconds: float, amplitude: float = 0.3, freq: float = 220.0) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def silence(seconds: float, noise: float = 0.001, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.normal(0, noise, int(seconds * SAMPLE_RATE)).astype(np.float32)
+
+
+def test_silence_has_no_speech():
+    assert detect_speech(silence(3.0)) == []
+    assert segment_speech(silence(3.0)) == []
+    assert detect_speech(np.zeros(10, dtype=np.float32)) == []
+
+
+def test_speech_runs_are_found_between_silences():
+    samples = np.concatenate([silence(1.0), tone(1.0), silence(1.0, seed=1), tone(1.5), silence(1.0, seed=2)])
+    segments = detect_speech(samples)
+    assert len(segments) == 2
+    (first_start, first_end), (second_start, second_end) = segments
+    # 발화 앞뒤 여유 구간(VAD_PAD_MS)을 감안해 대략 1~2초, 3~4.5초 구간
+    assert 0.7 * SAMPLE_RATE <= first_start <= 1.0 * SAMPLE_RATE
+    assert 2.0 * SAMPLE_RATE <= first_end <= 2.3 * SAMPLE_RATE
+    assert 2.7 * SAMPLE_RATE <= second_start <= 3.0 * SAMPLE_RATE
+    assert 4.5 * SAMPLE_RATE <= second_end <= 4.8 * SAMPLE_RATE
+
+
+def test_short_pauses_are_merged_and_short_blips_dropped():
+    samples = np.concatenate([
+        silence(1.0), tone(1.0), silence(0.1, seed=1), tone(1.0),   # 짧은 쉼 → 한 구간
+        silence(1.0, seed=2), tone(0.05), silence(1.0, seed=3),      # 짧은 소리 → 잡음
+    ])
+    segments = detect_speech(samples)
+    assert len(segments) == 1
+
+
+def test_segments_are_packed_up_to_max_seconds():
+    parts = []
+    for i in range(6):
+        parts += [silence(0.5, seed=i), tone(2.0)]
+    samples = np.concatenate(parts + [silence(0.5, seed=99)])
+    chunks = segment_speech(samples, max_seconds=5.0)
+    assert len(chunks) >= 3
+    assert all(len(chunk) <= 5.0 * SAMPLE_RATE for chunk in chunks)
+    # 무음이 제거되어 원본보다 짧음
+    assert sum(len(chunk) for chunk in chunks) < len(samples)
+
+
+def test_long_segment_is_split_at_the_quietest_point():
+    # 한 번에 길게 이어지는 발화 (중간에 살짝 작아지는 지점 포함)
+    loud = tone(6.0)
+    dip = tone(0.1, amplitude=0.02)
+    samples = np.concatenate([silence(0.5), loud, dip, loud, silence(0.5, seed=1)])
+    chunks = segment_speech(samples, max_seconds=8.0)
+    assert len(chunks) == 2
+    assert all(len(chunk) <= 8.0 * SAMPLE_RATE for chunk in chunks)
+    # 6초 발화 직후의 작은 구간 근처에서 잘림
+    assert abs(len(chunks[0]) - int(6.5 * SAMPLE_RATE)) < 0.5 * SAMPLE_RATE
@@ -0,0 +1,143 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from common.llm import chat
+from common.llm_cache import MemoryBackend, SqliteBackend, call_backend
+
+# 일지별 요약(digest) 저장소 설정
+WEEKLY_DIGEST_BACKEND = os.getenv("WEEKLY_DIGEST_BACKEND", "memory").lower()   # memory | sqlite
+WEEKLY_DIGEST_PATH = os.getenv("WEEKLY_DIGEST_PATH", "weekly_digests.sqlite3")
+WEEKLY_DIGEST_TTL = float(os.getenv("WEEKLY_DIGEST_TTL", str(60 * 24 * 60 * 60)))  # 60일
+WEEKLY_DIGEST_MAX_ENTRIES = int(os.getenv("WEEKLY_DIGEST_MAX_ENTRIES", "20000"))
+WEEKLY_DIGEST_CONCURRENCY = int(os.getenv("WEEKLY_DIGEST_CONCURRENCY", "4"))
+# 이보다 짧은 일지는 GPT 없이 그대로 digest로 사용
+WEEKLY_DIGEST_MIN_CHARS = int(os.getenv("WEEKLY_DIGEST_MIN_CHARS", "300"))
+
+DIGEST_PROMPT_VERSION = "weekly-digest:1"
+DIGEST_FIELDS = ("service", "physical", "mental", "mealSleep", "risks", "notes")
+
+
+def journal_hash(journal: dict) -> str:
+    payload = json.dumps(
+        {k: journal.get(k, "") for k in ("date", "careWorker", "service", "notes")},
+        ensure_ascii=False, sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DigestStore:
+    """일지 ID + 내용 해시 → digest(JSON) 저장소. 내용이 바뀐 일지만 다시 요약된다."""
+
+    def __init__(self, backend, ttl: float = WEEKLY_DIGEST_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(journal: dict) -> str:
+        return f"{DIGEST_PROMPT_VERSION}:{journal.get('id', '')}:{journal_hash(journal)}"
+
+    async def get(self, journal: dict):
+        value = await call_backend(self.backend, self.backend.get, self.key(journal))
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    async def set(self, journal: dict, digest: dict):
+        value = json.dumps(digest, ensure_ascii=False)
+        await call_backend(self.backend, self.backend.set, self.key(journal), value, time.time() + self.ttl)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self.backend.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+        }
+
+
+def create_digest_store() -> DigestStore:
+    if WEEKLY_DIGEST_BACKEND == "sqlite":
+        return DigestStore(SqliteBackend(WEEKLY_DIGEST_PATH, WEEKLY_DIGEST_MAX_ENTRIES))
+    return DigestStore(MemoryBackend(WEEKLY_DIGEST_MAX_ENTRIES))
+
+
+digest_store = create_digest_store()
+
+
+def digest_messages(journal: dict) -> list:
+    prompt = (
+        "아래는 요양보호 일지 1건이야. 주간보고서 작성에 필요한 내용만 항목별로 짧게 정리해서 JSON으로 반환해줘.\n"
+        "- 일지에 없는 내용은 추측하지 말고 빈 문자열로 둬.\n"
+        "- 각 항목은 1~2문장 이내로 간결하게 작성해.\n"
+        "- 코드블록, 설명 없이 JSON만 출력해.\n"
+        "{\n"
+        "  \"service\": \"제공한 서비스\",\n"
+        "  \"physical\": \"신체 상태\",\n"
+        "  \"mental\": \"정신/정서 상태\",\n"
+        "  \"mealSleep\": \"식사 및 수면\",\n"
+        "  \"risks\": \"위험 요소 및 주의사항\",\n"
+        "  \"notes\": \"기타 특이사항\"\n"
+        "}"
+    )
+    content = f"날짜: {journal.get('date', '')}\n요양보호사: {journal.get('careWorker', '')}\n서비스/상담 내용: {journal.get('service', '')}\n메모: {journal.get('notes', '')}"
+    return [
+        {"role": "system", "content": prompt},
+        {"role": "user", "content": content}
+    ]
+
+
+def parse_json_response(content: str) -> dict:
+    content = content.strip()
+    # 코드블록 제거
+    if content.startswith("```"):
+        content = re.sub(r"^```[a-zA-Z]*\n?", "", content)
+        content = re.sub(r"\n?```$", "", content)
+    return json.loads(content)
+
+
+async def digest_journal(journal: dict, bypass_cache: bool = False) -> dict:
+    if not bypass_cache:
+        cached = await digest_store.get(journal)
+        if cached is not None:
+            return cached
+    if len(str(journal.get("service", ""))) + len(str(journal.get("notes", ""))) < WEEKLY_DIGEST_MIN_CHARS:
+        digest = {field: "" for field in DIGEST_FIELDS}
+        digest.update({"service": journal.get("service", ""), "notes": journal.get("notes", "")})
+    else:
+        content = await chat(digest_messages(journal), validate=parse_json_response, label="weekly-digest")
+        parsed = parse_json_response(content)
+        digest = {field: str(parsed.get(field, "") or "") for field in DIGEST_FIELDS}
+    await digest_store.set(journal, digest)
+    return digest
+
+
+async def digest_journals(journals: list, bypass_cache: bool = False) -> list:
+    """일지별 digest를 병렬로 준비 (저장된 digest는 재사용, 새 일지만 GPT 호출)"""
+    semaphore = asyncio.Semaphore(WEEKLY_DIGEST_CONCURRENCY)
+
+    async def run(journal):
+        async with semaphore:
+            return await digest_journal(journal, bypass_cache)
+
+    return await asyncio.gather(*[run(journal) for journal in journals])
+
+
+def format_digests(journals: list, digests: list) -> str:
+    lines = []
+    for journal, digest in zip(journals, digests):
+        parts = [f"{journal.get('date', '')} {journal.get('careWorker', '')}"]
+        labels = (("service", "서비스"), ("physical", "신체"), ("mental", "정신/정서"),
+                  ("mealSleep", "식사/수면"), ("risks", "위험"), ("notes", "메모"))
+        for field, label in labels:
+            if digest.get(field):
+                parts.append(f"{label}: {digest[field]}")
+        lines.append("- " + " / ".join(parts))
+    return "\n".join(lines)
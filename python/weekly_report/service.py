@@ -1,21 +1,26 @@
 import os
+import json
+import time
 import uuid
-import platform
-import subprocess
-import boto3
+import asyncio
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from docxtpl import DocxTemplate
-from openai import OpenAI
-from docx import Document
+from docx.oxml.ns import qn
+from common.llm import chat, llm_limiter
+from common.metrics import timed
+from common.jobs import job_manager
+from common.lazy_pdf import CONTENT_HASH_METADATA, DOCUMENT_PDF_MODE, docx_content_hash, download_pdf_key, listing_pdf_key
+from common.s3 import object_url, presigned_url, sign_file_names, upload_bytes_many
+from common.pdf import convert_docx_bytes_to_pdf
+from common.templates import templates
+from weekly_report.digests import digest_journals, digest_store, format_digests, parse_json_response
 
 from fastapi.middleware.cors import CORSMiddleware
 
-# OpenAI API 키 로딩 (환경변수)
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
 class WeeklyReportRequest(BaseModel):
-    journalSummary: list  # [{date, careWorker, service, notes}, ...]
+    journalSummary: list  # [{id?, date, careWorker, service, notes}, ...]
     summary: str = None
     riskNotes: str = None
     evaluation: str = None
@@ -25,32 +30,18 @@ class WeeklyReportRequest(BaseModel):
 class FileDownloadRequest(BaseModel):
     file_name: str
 
-def convert_docx_to_pdf(docx_path, pdf_path):
-    if platform.system() == "Windows":
-        try:
-            from docx2pdf import convert
-            convert(docx_path, pdf_path)
-        except Exception as e:
-            raise Exception(f"docx2pdf(MS Word) PDF 변환 실패(Windows): {e}")
-    else:
-        output_dir = os.path.dirname(pdf_path)
-        try:
-            subprocess.run([
-                "libreoffice",
-                "--headless",
-                "--convert-to", "pdf",
-                "--outdir", output_dir,
-                docx_path
-            ], check=True)
-        except Exception as e:
-            raise Exception(f"LibreOffice PDF 변환 실패(Linux/Unix): {e}")
+class FileDownloadBatchRequest(BaseModel):
+    file_names: list[str]  # 확장자(.docx/.pdf)로 S3 경로를 구분
+
+# 프롬프트 템플릿 버전 (프롬프트 문구를 바꾸면 올려서 이전 캐시를 무효화)
+WEEKLY_PROMPT_VERSION = "weekly-report:2"
 
-def gpt_weekly_report_all(journalSummary, clientName, birthDate, guardianContact, reportDate, socialWorkerName):
-    text = "\n".join([
-        f"{j['date']} {j['careWorker']} {j['service']} {j['notes']}" for j in journalSummary
-    ])
+async def gpt_weekly_report_all(journalSummary, clientName, birthDate, guardianContact, reportDate, socialWorkerName, bypass_cache=False):
+    # 일지 원문 대신 일지별 digest(저장소에 있으면 재사용, 새/변경된 일지만 요약)를 모아서 주간보고서 생성
+    digests = await digest_journals(journalSummary, bypass_cache)
+    text = format_digests(journalSummary, digests)
     prompt = (
-        f"아래는 요양보호 일지 5개의 요약이야.\n{text}\n\n"
+        f"아래는 요양보호 일지 {len(journalSummary)}개를 항목별로 정리한 요약이야.\n{text}\n\n"
         "아래 항목들은 반드시 모두 포함해서 반환해줘. (누락 없이, 빈 값이라도 반드시 포함)\n"
         "기본 정보(대상자 이름, 생년월일, 보호자 연락처, 보고서 작성일, 작성자(복지사))는 아래 입력값을 그대로 사용하고, "
         "나머지 항목(요양 등급, 건강 및 생활상태 요약, 위험요소, 평가 및 제언, 추천사항, 신체 상태 변화, 정신/정서 상태, 식사 및 수면 패턴, 일지 요약 표)은 네가 생성해줘.\n"
@@ -91,31 +82,127 @@ def gpt_weekly_report_all(journalSummary, clientName, birthDate, guardianContact
         "반드시 코드블록 없이, key와 value 모두 쌍따옴표로 감싼 올바른 JSON만 반환해줘. 설명, 주석, 코드블록, 불필요한 텍스트 없이 JSON만 출력해."
         "- 요양 등급(careLevel)은 반드시 어르신의 상태와 일지 내용을 바탕으로 추정해서 채워줘. (예: '요양 2등급', '요양 3등급' 등, 빈 값 금지)\n"
     )
-    response = client.chat.completions.create(
-        model="gpt-4.1",
-        messages=[{"role": "system", "content": prompt}]
-    )
-    content = response.choices[0].message.content.strip()
-    # 코드블록 제거
-    if content.startswith("```"):
-        import re
-        content = re.sub(r"^```[a-zA-Z]*\n?", "", content)
-        content = re.sub(r"\n?```$", "", content)
-    import json as pyjson
-    return pyjson.loads(content)
+    messages = [{"role": "system", "content": prompt}]
+    # 같은 입력으로 다시 생성하는 경우 캐시된 응답 사용 (bypass_cache=True면 새로 생성해서 갱신)
+    content = await chat(messages, model="gpt-4.1", cache_version=WEEKLY_PROMPT_VERSION,
+                         bypass_cache=bypass_cache, validate=parse_json_response)
+    return parse_json_response(content)
 
-def remove_empty_table_rows(docx_path):
-    doc = Document(docx_path)
-    for table in doc.tables:
-        rows_to_remove = []
-        for i, row in enumerate(table.rows):
-            if all(cell.text.strip() == "" for cell in row.cells):
-                rows_to_remove.append(i)
-        for i in reversed(rows_to_remove):
+def remove_empty_table_rows(doc):
+    """렌더링된 문서 객체에서 모든 셀이 비어 있는 표 행을 제거 (저장/재파싱 없이 XML에서 직접 처리)"""
+    with timed("row_pruning"):
+        for table in doc.tables:
             tbl = table._tbl
-            tr = table.rows[i]._tr
-            tbl.remove(tr)
-    doc.save(docx_path)
+            for tr in list(tbl.tr_lst):
+                if not "".join(t.text or "" for t in tr.iter(qn("w:t"))).strip():
+                    tbl.remove(tr)
+
+def render_weekly_report_docx(context: dict):
+    """docx 렌더링 후 (파일명, docx 바이트) 반환"""
+    # 파일명
+    filename = f"weekly-report-{uuid.uuid4()}.docx"
+    print(f"[3] docx 렌더링 + 빈 표 행 삭제(메모리): {filename}")
+    # 빈 표 행(빈 줄) 삭제 후처리까지 문서 객체에서 끝낸 뒤 한 번만 직렬화
+    docx_bytes = templates.render_to_bytes("주간보고서양식.docx", context, cleanups=(remove_empty_table_rows,))
+    return filename, docx_bytes
+
+def convert_weekly_report_pdf(filename: str, docx_bytes: bytes) -> bytes:
+    print(f"[4] docx → pdf 변환 시작: {filename}")
+    # docx → pdf 변환
+    pdf_bytes = convert_docx_bytes_to_pdf(docx_bytes, filename[:-len('.docx')])
+    print(f"[5] docx → pdf 변환 완료: {filename.replace('.docx', '.pdf')}")
+    return pdf_bytes
+
+def upload_weekly_report_files(filename: str, docx_bytes: bytes, pdf_bytes: bytes = None):
+    """docx/pdf를 메모리 버퍼에서 S3로 동시 업로드 후 (docx URL, pdf URL) 반환
+
+    pdf_bytes가 없으면(lazy 모드) 아직 PDF가 없으므로 pdf URL은 None (다운로드는 /download-weekly-pdf-url로)
+    """
+    docx_s3_key = f"weekly-report/docx/{filename}"
+    pdf_s3_key = f"weekly-report/pdf/{filename.replace('.docx', '.pdf')}"
+
+    if pdf_bytes is None:
+        print(f"[6] S3 업로드 시작(PDF는 첫 요청 시 생성): {docx_s3_key}")
+        items = [(docx_s3_key, docx_bytes, {CONTENT_HASH_METADATA: docx_content_hash(docx_bytes)})]
+    else:
+        print(f"[6] S3 업로드 시작: {docx_s3_key}, {pdf_s3_key}")
+        items = [(docx_s3_key, docx_bytes), (pdf_s3_key, pdf_bytes)]
+    for error in upload_bytes_many(items):
+        if error is not None:
+            raise error
+    print(f"[7] S3 업로드 완료")
+    return object_url(docx_s3_key), object_url(pdf_s3_key) if pdf_bytes is not None else None
+
+async def build_weekly_report(data: dict, job=None) -> dict:
+    """주간보고서 생성 파이프라인 (llm → render → pdf → upload), 단계별 동시 실행 수 제한 적용"""
+    print("[1] GPT 변환 시작")
+    # GPT로 모든 항목 자동 생성 (기본 정보는 입력값 그대로 전달)
+    async with job_manager.stage(job, "llm"):
+        gpt_result = await gpt_weekly_report_all(
+            data["journalSummary"],
+            data.get("clientName", ""),
+            data.get("birthDate", ""),
+            data.get("guardianContact", ""),
+            data.get("reportDate", ""),
+            data.get("socialWorkerName", ""),
+            bypass_cache=bool(data.get("bypassCache", False))
+        )
+    print("[2] GPT 변환 완료")
+    context = {
+        "title": gpt_result.get("title", ""),
+        "clientName": data.get("clientName", ""),
+        "birthDate": data.get("birthDate", ""),
+        "careLevel": gpt_result.get("careLevel", ""),
+        "guardianContact": data.get("guardianContact", ""),
+        "reportDate": data.get("reportDate", ""),
+        "periodStart": data.get("periodStart", data.get("period_start", "")),
+        "periodEnd": data.get("periodEnd", data.get("period_end", "")),
+        "socialWorkerName": data.get("socialWorkerName", ""),
+        "journalSummary": gpt_result.get("journalSummary", []),
+        "summary": gpt_result.get("summary", ""),
+        "riskNotes": gpt_result.get("riskNotes", ""),
+        "evaluation": gpt_result.get("evaluation", ""),
+        "suggestion": gpt_result.get("suggestion", ""),
+        "physicalStatus": gpt_result.get("physicalStatus", ""),
+        "mentalStatus": gpt_result.get("mentalStatus", ""),
+        "mealSleepPattern": gpt_result.get("mealSleepPattern", ""),
+    }
+
+    async with job_manager.stage(job, "render"):
+        filename, docx_bytes = await run_in_threadpool(render_weekly_report_docx, context)
+    pdf_bytes = None
+    if DOCUMENT_PDF_MODE != "lazy":
+        async with job_manager.stage(job, "pdf"):
+            pdf_bytes = await run_in_threadpool(convert_weekly_report_pdf, filename, docx_bytes)
+    async with job_manager.stage(job, "upload"):
+        docx_url, pdf_url = await run_in_threadpool(upload_weekly_report_files, filename, docx_bytes, pdf_bytes)
+
+    return {
+        "file": filename,
+        "docx_url": docx_url,
+        "pdf_url": pdf_url,
+        "exportedDocx": docx_url,
+        "exportedPdf": pdf_url,
+        "periodStart": context["periodStart"],
+        "periodEnd": context["periodEnd"],
+        **{
+            "title": context["title"],
+            "clientName": context["clientName"],
+            "birthDate": context["birthDate"],
+            "careLevel": context["careLevel"],
+            "guardianContact": context["guardianContact"],
+            "reportDate": context["reportDate"],
+            "socialWorkerName": context["socialWorkerName"],
+            "journalSummary": context["journalSummary"],
+            "summary": context["summary"],
+            "physicalStatus": context["physicalStatus"],
+            "mentalStatus": context["mentalStatus"],
+            "mealSleepPattern": context["mealSleepPattern"],
+            "riskNotes": context["riskNotes"],
+            "evaluation": context["evaluation"],
+            "suggestion": context["suggestion"],
+        }
+    }
 
 def create_weekly_report_app() -> FastAPI:
     app = FastAPI(strict_slashes=False)
@@ -128,142 +215,108 @@ def create_weekly_report_app() -> FastAPI:
     )
 
     @app.post("/")
-    def generate_weekly_report(data: dict):
+    async def generate_weekly_report(data: dict):
         import traceback
         try:
-            print("[1] GPT 변환 시작")
-            # GPT로 모든 항목 자동 생성 (기본 정보는 입력값 그대로 전달)
-            gpt_result = gpt_weekly_report_all(
-                data["journalSummary"],
-                data.get("clientName", ""),
-                data.get("birthDate", ""),
-                data.get("guardianContact", ""),
-                data.get("reportDate", ""),
-                data.get("socialWorkerName", "")
-            )
-            print("[2] GPT 변환 완료")
-            tpl = DocxTemplate("주간보고서양식.docx")
-            context = {
-                "title": gpt_result.get("title", ""),
-                "clientName": data.get("clientName", ""),
-                "birthDate": data.get("birthDate", ""),
-                "careLevel": gpt_result.get("careLevel", ""),
-                "guardianContact": data.get("guardianContact", ""),
-                "reportDate": data.get("reportDate", ""),
-                "periodStart": data.get("periodStart", data.get("period_start", "")),
-                "periodEnd": data.get("periodEnd", data.get("period_end", "")),
-                "socialWorkerName": data.get("socialWorkerName", ""),
-                "journalSummary": gpt_result.get("journalSummary", []),
-                "summary": gpt_result.get("summary", ""),
-                "riskNotes": gpt_result.get("riskNotes", ""),
-                "evaluation": gpt_result.get("evaluation", ""),
-                "suggestion": gpt_result.get("suggestion", ""),
-                "physicalStatus": gpt_result.get("physicalStatus", ""),
-                "mentalStatus": gpt_result.get("mentalStatus", ""),
-                "mealSleepPattern": gpt_result.get("mealSleepPattern", ""),
-            }
-            tpl.render(context)
+            return await build_weekly_report(data)
+        except Exception as e:
+            print("[에러 발생]", traceback.format_exc())
+            raise HTTPException(status_code=500, detail=str(e))
 
-            # 파일명/경로
-            filename = f"weekly-report-{uuid.uuid4()}.docx"
-            pdf_filename = filename.replace('.docx', '.pdf')
-            os.makedirs("generated", exist_ok=True)
-            docx_path = os.path.join("generated", filename)
-            pdf_path = os.path.join("generated", pdf_filename)
+    @app.post("/jobs", status_code=202)
+    async def submit_weekly_report_job(data: dict):
+        """주간보고서 생성을 백그라운드 작업으로 등록하고 작업 ID를 즉시 반환 (GET /jobs/{id} 폴링 또는 callbackUrl 수신)"""
+        if "journalSummary" not in data:
+            raise HTTPException(status_code=422, detail="journalSummary가 필요합니다.")
+        job = await job_manager.submit("weekly_report", lambda job: build_weekly_report(data, job), data.get("callbackUrl"))
+        return {"jobId": job.id, "status": job.status}
 
-            print(f"[3] docx 저장: {docx_path}")
-            # docx 저장
-            tpl.save(docx_path)
+    @app.get("/jobs/{job_id}")
+    async def get_weekly_report_job(job_id: str):
+        job = await job_manager.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+        return job
 
-            print(f"[4] 빈 표 행 삭제: {docx_path}")
-            # 빈 표 행(빈 줄) 삭제 후처리
-            remove_empty_table_rows(docx_path)
+    @app.post("/bulk")
+    async def generate_weekly_reports_bulk(data: dict):
+        """여러 어르신의 주간보고서를 동시에 생성하고, 끝나는 순서대로 NDJSON 한 줄씩 스트리밍
 
-            print(f"[5] docx → pdf 변환 시작: {docx_path} -> {pdf_path}")
-            # docx → pdf 변환
-            convert_docx_to_pdf(docx_path, pdf_path)
-            print(f"[6] docx → pdf 변환 완료: {pdf_path}")
+        - 요청: {"reports": [주간보고서 요청 payload, ...]} (각 payload에 key를 넣으면 결과에 그대로 돌려줌)
+        - 응답 줄: {"type": "result", "index", "key", "status": "succeeded"|"failed", "result"|"error", "seconds"}
+          마지막 줄: {"type": "done", "total", "succeeded", "failed", "seconds"}
+        - 단계별 동시 실행 수는 JOB_STAGE_LIMITS, GPT 호출은 llm_limiter(429 시 자동 감속)가 제한
+        """
+        import traceback
+        reports = data.get("reports")
+        if not isinstance(reports, list) or not reports:
+            raise HTTPException(status_code=422, detail="reports 목록이 필요합니다.")
 
-            # S3 업로드
-            BUCKET_NAME = 'oncare-backend'
-            s3 = boto3.client('s3')
-            docx_s3_key = f"weekly-report/docx/{filename}"
-            pdf_s3_key = f"weekly-report/pdf/{pdf_filename}"
+        async def run(index, payload):
+            start = time.time()
+            # 객체가 아닌 항목은 스트림 전체를 끊지 않고 해당 줄만 failed로 보고
+            line = {"type": "result", "index": index, "key": payload.get("key") if isinstance(payload, dict) else None}
+            try:
+                if not isinstance(payload, dict):
+                    raise HTTPException(status_code=422, detail="보고서 요청은 객체여야 합니다.")
+                line.update(status="succeeded", result=await build_weekly_report(payload))
+            except Exception as e:
+                print(f"[일괄 생성 에러] index={index}", traceback.format_exc())
+                line.update(status="failed", error=getattr(e, "detail", None) or str(e))
+            line["seconds"] = round(time.time() - start, 2)
+            return line
 
-            print(f"[7] S3 업로드 시작: {docx_s3_key}, {pdf_s3_key}")
-            s3.upload_file(docx_path, BUCKET_NAME, docx_s3_key)
-            s3.upload_file(pdf_path, BUCKET_NAME, pdf_s3_key)
-            print(f"[8] S3 업로드 완료")
+        async def stream():
+            start = time.time()
+            tasks = [asyncio.create_task(run(i, payload)) for i, payload in enumerate(reports)]
+            succeeded = 0
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    line = await next_done
+                    succeeded += line["status"] == "succeeded"
+                    yield json.dumps(line, ensure_ascii=False) + "\n"
+                yield json.dumps({
+                    "type": "done",
+                    "total": len(tasks),
+                    "succeeded": succeeded,
+                    "failed": len(tasks) - succeeded,
+                    "seconds": round(time.time() - start, 2),
+                }, ensure_ascii=False) + "\n"
+            finally:
+                # 클라이언트 연결이 끊기면 남은 작업 취소
+                for task in tasks:
+                    task.cancel()
 
-            docx_url = f"https://{BUCKET_NAME}.s3.amazonaws.com/{docx_s3_key}"
-            pdf_url = f"https://{BUCKET_NAME}.s3.amazonaws.com/{pdf_s3_key}"
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
 
-            print(f"[9] 로컬 파일 삭제 시작: {docx_path}, {pdf_path}")
-            # (선택) 로컬 파일 삭제
-            os.remove(docx_path)
-            os.remove(pdf_path)
-            print(f"[10] 로컬 파일 삭제 완료")
+    @app.get("/llm/stats")
+    async def llm_limiter_stats():
+        return llm_limiter.stats()
 
-            return {
-                "file": filename,
-                "docx_url": docx_url,
-                "pdf_url": pdf_url,
-                "exportedDocx": docx_url,
-                "exportedPdf": pdf_url,
-                "periodStart": context["periodStart"],
-                "periodEnd": context["periodEnd"],
-                **{
-                    "title": context["title"],
-                    "clientName": context["clientName"],
-                    "birthDate": context["birthDate"],
-                    "careLevel": context["careLevel"],
-                    "guardianContact": context["guardianContact"],
-                    "reportDate": context["reportDate"],
-                    "socialWorkerName": context["socialWorkerName"],
-                    "journalSummary": context["journalSummary"],
-                    "summary": context["summary"],
-                    "physicalStatus": context["physicalStatus"],
-                    "mentalStatus": context["mentalStatus"],
-                    "mealSleepPattern": context["mealSleepPattern"],
-                    "riskNotes": context["riskNotes"],
-                    "evaluation": context["evaluation"],
-                    "suggestion": context["suggestion"],
-                }
-            }
-        except Exception as e:
-            print("[에러 발생]", traceback.format_exc())
-            raise HTTPException(status_code=500, detail=str(e))
+    @app.get("/digests/stats")
+    def weekly_digest_stats():
+        return digest_store.stats()
 
     @app.post("/download-weekly-docx-url")
     def get_weekly_docx_download_url(req: FileDownloadRequest):
-        BUCKET_NAME = 'oncare-backend'
-        s3 = boto3.client('s3', region_name='ap-northeast-2')
-        file_name = req.file_name.strip()
-        docx_s3_key = f"weekly-report/docx/{file_name}"
         try:
-            url = s3.generate_presigned_url(
-                ClientMethod='get_object',
-                Params={'Bucket': BUCKET_NAME, 'Key': docx_s3_key},
-                ExpiresIn=60 * 10  # 10분
-            )
+            url = presigned_url(f"weekly-report/docx/{req.file_name.strip()}")
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
         return {"download_url": url}
 
     @app.post("/download-weekly-pdf-url")
     def get_weekly_pdf_download_url(req: FileDownloadRequest):
-        BUCKET_NAME = 'oncare-backend'
-        s3 = boto3.client('s3', region_name='ap-northeast-2')
-        file_name = req.file_name.strip()
-        pdf_s3_key = f"weekly-report/pdf/{file_name}"
+        # lazy 모드로 생성된 보고서는 첫 요청 시 변환 (같은 내용의 문서는 변환 결과 공유)
         try:
-            url = s3.generate_presigned_url(
-                ClientMethod='get_object',
-                Params={'Bucket': BUCKET_NAME, 'Key': pdf_s3_key},
-                ExpiresIn=60 * 10  # 10분
-            )
+            url = presigned_url(download_pdf_key("weekly-report", req.file_name.strip()))
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
         return {"download_url": url}
 
+    @app.post("/download-weekly-urls")
+    def get_weekly_download_urls(req: FileDownloadBatchRequest):
+        """여러 주간보고서 파일(.docx/.pdf)의 presigned URL을 한 번에 반환"""
+        return sign_file_names("weekly-report", req.file_names, pdf_key=listing_pdf_key())
+
     return app
\ No newline at end of file
@@ -0,0 +1,15 @@
+import { ApiProperty } from '@nestjs/swagger';
+
+export class DownloadUrlsRequestDto {
+  @ApiProperty({ example: [1, 2, 3], description: '일지 ID 목록' })
+  ids: number[];
+}
+
+export class JournalDownloadUrlItemDto {
+  @ApiProperty({ example: 1 })
+  id: number;
+  @ApiProperty({ example: 'https://oncare-backend.s3.amazonaws.com/journal/docx/...', nullable: true })
+  docx_url: string | null;
+  @ApiProperty({ example: 'https://oncare-backend.s3.amazonaws.com/journal/pdf/...', nullable: true })
+  pdf_url: string | null;
+}
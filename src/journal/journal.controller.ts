@@ -29,6 +29,10 @@ import {
 import { TranscriptUpdateDto } from './dto/update-transcript.dto';
 import { JournalSummaryResponseDto } from './dto/journal-summary-response.dto';
 import { DownloadUrlResponseDto } from './dto/download-url-response.dto';
+import {
+  DownloadUrlsRequestDto,
+  JournalDownloadUrlItemDto,
+} from './dto/download-urls.dto';
 import {
   GetJournalListByDateRangeQueryDto,
   GetJournalListByDateRangeResponseDto,
@@ -219,6 +223,36 @@ export class JournalController {
     }
   }
 
+  // 여러 일지의 presigned url 일괄 반환 (목록 화면용)
+  @Post('download-urls')
+  @HttpCode(HttpStatus.OK)
+  @ApiOperation({
+    summary: '여러 일지의 DOCX/PDF presigned url 일괄 반환',
+    description: '일지 ID 목록을 받아 각 일지의 docx/pdf presigned url을 한 번에 반환합니다.',
+  })
+  @ApiOkResponse({
+    description: '일지별 DOCX/PDF presigned url',
+    type: JournalDownloadUrlItemDto,
+    isArray: true,
+  })
+  async downloadUrls(
+    @Body() body: DownloadUrlsRequestDto,
+    @CurrentUser() user,
+  ): Promise<JournalDownloadUrlItemDto[]> {
+    if (user.role !== 'careWorker') {
+      throw new ForbiddenException('요양보호사만 접근할 수 있습니다.');
+    }
+    try {
+      return await this.journalService.findPresignedUrls(body.ids ?? [], user.id);
+    } catch (error) {
+      if (error instanceof HttpException) throw error;
+      throw new HttpException(
+        'presigned url 일괄 생성 중 서버 오류',
+        HttpStatus.INTERNAL_SERVER_ERROR,
+      );
+    }
+  }
+
   // PDF presigned url 반환
   @Post(':id/download-pdf')
   @HttpCode(HttpStatus.OK)
@@ -232,7 +232,11 @@ export class JournalService {
       this.httpService.post(
         'http://127.0.0.1:5000/generate-journal-docx',
         requestBody,
-        { timeout: 60000 },
+        {
+          // FastAPI 로그/Server-Timing과 묶어 보기 위한 요청 ID
+          headers: { 'X-Request-Id': `journal-${journal.id}` },
+          timeout: 60000,
+        },
       ),
     );
 
@@ -339,21 +343,56 @@ export class JournalService {
     const journal = await this.prisma.journal.findUnique({
       where: { id: Number(id) },
     });
-    if (!journal || !journal.exportedPdf)
+    if (!journal || !(journal.exportedPdf || journal.exportedDocx))
       throw new Error('pdf 파일이 존재하지 않습니다.');
-    let fileName = journal.exportedPdf as string;
+    // lazy 모드(DOCUMENT_PDF_MODE=lazy)로 생성된 일지는 exportedPdf가 없으므로 docx 파일명으로 요청 (첫 요청 시 PDF 변환)
+    let fileName = (journal.exportedPdf ||
+      (journal.exportedDocx as string).replace(/\.docx$/, '.pdf')) as string;
     if (fileName.includes('/')) fileName = fileName.split('/').pop() as string;
     // 2. Python 서버 presigned url API 호출
     const { data } = await firstValueFrom(
       this.httpService.post(
         'http://127.0.0.1:5000/generate-journal-docx/download-pdf-url',
         { file_name: fileName },
-        { timeout: 10000 },
+        // lazy 모드(DOCUMENT_PDF_MODE=lazy)에서는 첫 요청 시 PDF 변환(오피스 기동 포함)이 응답에 포함될 수 있음
+        { timeout: 300000 },
       ),
     );
     return data;
   }
 
+  // 목록 화면용: 여러 일지의 docx/pdf presigned url을 한 번에 발급 (Python 서버 1회 호출)
+  async findPresignedUrls(ids: number[], careWorkerId: number) {
+    const journals = await this.prisma.journal.findMany({
+      where: { id: { in: ids.map(Number) }, careWorkerId },
+      select: { id: true, exportedDocx: true, exportedPdf: true },
+    });
+    const fileName = (value?: string | null) =>
+      value ? (value.split('/').pop() as string) : null;
+    // lazy 모드로 생성된 일지는 exportedPdf가 없으므로 docx 파일명에서 PDF 파일명을 만듦 (변환 전이면 pending)
+    const pdfName = (j: { exportedDocx: string | null; exportedPdf: string | null }) =>
+      fileName(j.exportedPdf) ?? fileName(j.exportedDocx)?.replace(/\.docx$/, '.pdf') ?? null;
+    const fileNames = journals
+      .flatMap((j) => [fileName(j.exportedDocx), pdfName(j)])
+      .filter((name): name is string => !!name);
+    if (fileNames.length === 0) {
+      return journals.map((j) => ({ id: j.id, docx_url: null, pdf_url: null }));
+    }
+    const { data } = await firstValueFrom(
+      this.httpService.post(
+        'http://127.0.0.1:5000/generate-journal-docx/download-urls',
+        { file_names: fileNames },
+        { timeout: 10000 },
+      ),
+    );
+    const urls: Record<string, string> = data.urls ?? {};
+    return journals.map((j) => ({
+      id: j.id,
+      docx_url: urls[fileName(j.exportedDocx) ?? ''] ?? null,
+      pdf_url: urls[pdfName(j) ?? ''] ?? null,
+    }));
+  }
+
   // 녹음본 수정
   async modifyTranscript({
     id,
@@ -0,0 +1,15 @@
+import { ApiProperty } from '@nestjs/swagger';
+
+export class WeeklyReportDownloadUrlsRequestDto {
+  @ApiProperty({ example: [1, 2, 3], description: '주간보고서 ID 목록' })
+  ids: number[];
+}
+
+export class WeeklyReportDownloadUrlItemDto {
+  @ApiProperty({ example: 1 })
+  id: number;
+  @ApiProperty({ example: 'https://oncare-backend.s3.amazonaws.com/weekly-report/docx/...', nullable: true })
+  docx_url: string | null;
+  @ApiProperty({ example: 'https://oncare-backend.s3.amazonaws.com/weekly-report/pdf/...', nullable: true })
+  pdf_url: string | null;
+}
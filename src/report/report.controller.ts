@@ -24,6 +24,10 @@ import { CreateWeeklyReportResponseDto, WEEKLY_REPORT_RESPONSE_EXAMPLE } from '.
 import { JwtAuthGuard } from 'src/auth/guards/jwt-auth.guard';
 import { CurrentUser } from 'src/auth/decorators/current-user.decorator';
 import { DownloadUrlResponseDto } from '../journal/dto/download-url-response.dto';
+import {
+  WeeklyReportDownloadUrlsRequestDto,
+  WeeklyReportDownloadUrlItemDto,
+} from './dto/download-urls.dto';
 
 @UseGuards(JwtAuthGuard)
 @ApiBearerAuth('JWT')
@@ -101,6 +105,34 @@ export class ReportController {
     return this.reportService.createWeeklyReportsGrouped(dto, user);
   }
 
+  // 여러 주간보고서의 presigned url 일괄 반환 (목록 화면용)
+  @Post('download-urls')
+  @HttpCode(HttpStatus.OK)
+  @ApiOperation({
+    summary: '여러 주간보고서의 DOCX/PDF presigned url 일괄 반환',
+    description: '주간보고서 ID 목록을 받아 각 보고서의 docx/pdf presigned url을 한 번에 반환합니다.',
+  })
+  @ApiResponse({
+    status: HttpStatus.OK,
+    description: '주간보고서별 DOCX/PDF presigned url',
+    type: WeeklyReportDownloadUrlItemDto,
+    isArray: true,
+  })
+  @ApiResponse({
+    status: HttpStatus.FORBIDDEN,
+    description: '복지사 권한 없음',
+    schema: { example: { statusCode: 403, message: '복지사만 접근할 수 있습니다.', error: 'Forbidden' } }
+  })
+  async downloadWeeklyUrls(
+    @Body() body: WeeklyReportDownloadUrlsRequestDto,
+    @CurrentUser() user,
+  ): Promise<WeeklyReportDownloadUrlItemDto[]> {
+    if (user.role !== 'socialWorker') {
+      throw new ForbiddenException('복지사만 접근할 수 있습니다.');
+    }
+    return this.reportService.findWeeklyReportPresignedUrls(body.ids ?? []);
+  }
+
   @Get(':id')
   @HttpCode(HttpStatus.OK)
   @ApiOperation({
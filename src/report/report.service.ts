@@ -16,6 +16,7 @@ import * as timezone from 'dayjs/plugin/timezone';
 import * as isSameOrAfter from 'dayjs/plugin/isSameOrAfter';
 import * as isSameOrBefore from 'dayjs/plugin/isSameOrBefore';
 import { DownloadUrlResponseDto } from '../journal/dto/download-url-response.dto';
+import { WeeklyReportDownloadUrlItemDto } from './dto/download-urls.dto';
 dayjs.extend(utc);
 dayjs.extend(timezone);
 dayjs.extend(isSameOrAfter);
@@ -147,6 +148,7 @@ export class ReportService {
     }
     console.log('[DEBUG] 최종 보고서에 들어가는 일지:', journals.map(j => ({ id: j.id, createdAt: j.createdAt, clientId: j.clientId })));
     const journalSummary = journals.map(j => ({
+      id: j.id,
       date: j.createdAt.toISOString().slice(0, 10),
       careWorker: j.careWorker?.name ?? '',
       service: j.transcript ?? '',
@@ -203,7 +205,11 @@ export class ReportService {
       const response = await axios.post(
         'http://127.0.0.1:5000/generate-weekly-report',
         fastApiPayload,
-        { timeout: 3600000 },
+        {
+          // FastAPI 로그/Server-Timing과 묶어 보기 위한 요청 ID
+          headers: { 'X-Request-Id': `weekly-report-${report.id}` },
+          timeout: 3600000,
+        },
       );
       data = response.data as Record<string, any>;
     } catch (error: any) {
@@ -416,6 +422,38 @@ export class ReportService {
     return results;
   }
 
+  // 목록 화면용: 여러 주간보고서의 docx/pdf presigned url을 한 번에 발급 (Python 서버 1회 호출)
+  async findWeeklyReportPresignedUrls(
+    ids: number[],
+  ): Promise<WeeklyReportDownloadUrlItemDto[]> {
+    const reports = await this.prisma.report.findMany({
+      where: { id: { in: ids.map(Number) } },
+      select: { id: true, exportedDocx: true, exportedPdf: true },
+    });
+    const fileName = (value?: string | null) =>
+      value ? (value.split('/').pop() as string) : null;
+    // lazy 모드로 생성된 보고서는 exportedPdf가 없으므로 docx 파일명에서 PDF 파일명을 만듦 (변환 전이면 pending)
+    const pdfName = (r: { exportedDocx: string | null; exportedPdf: string | null }) =>
+      fileName(r.exportedPdf) ?? fileName(r.exportedDocx)?.replace(/\.docx$/, '.pdf') ?? null;
+    const fileNames = reports
+      .flatMap((r) => [fileName(r.exportedDocx), pdfName(r)])
+      .filter((name): name is string => !!name);
+    if (fileNames.length === 0) {
+      return reports.map((r) => ({ id: r.id, docx_url: null, pdf_url: null }));
+    }
+    const { data } = await axios.post(
+      'http://127.0.0.1:5000/generate-weekly-report/download-weekly-urls',
+      { file_names: fileNames },
+      { timeout: 10000 },
+    );
+    const urls: Record<string, string> = data.urls ?? {};
+    return reports.map((r) => ({
+      id: r.id,
+      docx_url: urls[fileName(r.exportedDocx) ?? ''] ?? null,
+      pdf_url: urls[pdfName(r) ?? ''] ?? null,
+    }));
+  }
+
   async findWeeklyReportDocxPresignedUrl(
     id: number,
   ): Promise<DownloadUrlResponseDto> {
@@ -443,15 +481,18 @@ export class ReportService {
     id: number,
   ): Promise<DownloadUrlResponseDto> {
     const report = await this.prisma.report.findUnique({ where: { id } });
-    if (!report || !report.exportedPdf)
+    if (!report || !(report.exportedPdf || report.exportedDocx))
       throw new NotFoundException('pdf 파일이 존재하지 않습니다.');
-    let fileName = report.exportedPdf as string;
+    // lazy 모드(DOCUMENT_PDF_MODE=lazy)로 생성된 보고서는 exportedPdf가 없으므로 docx 파일명으로 요청 (첫 요청 시 PDF 변환)
+    let fileName = (report.exportedPdf ||
+      (report.exportedDocx as string).replace(/\.docx$/, '.pdf')) as string;
     if (fileName.includes('/')) fileName = fileName.split('/').pop() as string;
     try {
       const { data } = await axios.post(
         'http://127.0.0.1:5000/generate-weekly-report/download-weekly-pdf-url',
         { file_name: fileName },
-        { timeout: 10000 },
+        // lazy 모드(DOCUMENT_PDF_MODE=lazy)에서는 첫 요청 시 PDF 변환(오피스 기동 포함)이 응답에 포함될 수 있음
+        { timeout: 300000 },
       );
       return data as DownloadUrlResponseDto;
     } catch (error: any) {